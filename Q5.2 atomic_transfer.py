@@ -1,146 +1,25 @@
-from algosdk.v2client import algod
-from algosdk import account, mnemonic, transaction
+import os
+from algo_utils.accounts import accountGen, loadAccount
+from algo_utils.balances import accountBalance, assetBalanceCheck
+from algo_utils.instrument import Instrumentation, printSummary
+from algo_utils.mint import ASAmint
+from algo_utils.nodepool import MultiNodeAlgodClient
+from algo_utils.optin import optIn
+from algo_utils.swap import atomicTransfer
+from algo_utils.transport import PooledAlgodClient
 
-def accountGen():
-    '''Account creation function that will generate a new account key pair with mnemonic'''
-    privateKey, publicAdress = account.generate_account() # Generate account key pair
-    mnemon=mnemonic.from_private_key(privateKey)  # Obtain mnemonic to use the same account later  
-    return {"privateKey": privateKey,"publicAdress": publicAdress,"mnemon": mnemon }
-
-def loadAccount(mnemon):
-    '''Load the accounts for recovery purposes and loading accounts with a positive balance via dispensory'''
-    try:
-        privateKey = mnemonic.to_private_key(mnemon)
-        publicAdress = account.address_from_private_key(privateKey)  
-        return {"privateKey": privateKey, "publicAdress": publicAdress, "mnemon": mnemon}
-    except Exception as e:
-        print(f"error loading account: {e}")
-        return None
-
-def accountBalance(accountName, algodClient): 
-    '''Obtain account balance'''
-    try:
-        accountInfo = algodClient.account_info(accountName["publicAdress"])
-        accountBalance = accountInfo["amount"]
-        return accountBalance
-    except Exception as e:
-        print(f"Error fetching account balance: {e}")
-        return None
-
-def ASAmint(algodClient, accountName, name, totalNumAsset):
-    '''Issue ASA called UCTZAR'''
-    try:
-        param = algodClient.suggested_params()
-        param.fee = 1000
-        param.flat_fee = True
-        
-         # check Account balance is enough for the transactions when issuing ASA
-        balance = accountBalance(accountName, algodClient)
-    
-        if balance < param.fee:
-            print("Insufficient funds in the account.")
-            return
-
-        txn = transaction.AssetConfigTxn(
-            sender=accountName["publicAdress"],
-            sp=param,
-            total=totalNumAsset,
-            default_frozen=False,
-            unit_name= name.upper(),
-            asset_name= name.lower(),
-            manager=accountName["publicAdress"],
-            reserve=accountName["publicAdress"],
-            freeze=accountName["publicAdress"],
-            clawback=accountName["publicAdress"],
-            decimals=0)
-
-
-        stxn = txn.sign(accountName["privateKey"])
-        txid = algodClient.send_transaction(stxn)
-        print(f"Asset has been sent with txid: {txid}")
-
-        results = transaction.wait_for_confirmation(algodClient, txid, 4) # 4 rounds for verifiation
-        assetId = results["asset-index"]
-        print(f"Asset ID for {name.upper()} : {assetId}")
-        
-        return assetId
-
-    except Exception as e:
-        print(f"Error issuing ASA: {e}")
-        return None
-             
-def assetBalanceCheck(algodClient, accountName, assetId) :
-    '''Check asset balance for accounts'''
-    try : 
-        accountInfo  = algodClient.account_info(accountName["publicAdress"])
-        assetHoldings = accountInfo.get("assets", [])
-        for asset in assetHoldings:
-            if asset["asset-id"] == assetId:
-                assetBalance = asset["amount"]
-                break 
-        return assetBalance
-    
-    except Exception as e:
-        
-        print(f"Error checking asset balance: {e}")
-        return None
-
-def optIn(algodClient, accountName, assetId):
-    try:
-        param = algodClient.suggested_params()
-        param.fee = 1000
-        param.flatFee = True
-
-        optinTxn = transaction.AssetOptInTxn(sender=accountName["publicAdress"], sp=param, index=assetId)
-        signedOptinTxn = optinTxn.sign(accountName["privateKey"])
-        txId = algodClient.send_transaction(signedOptinTxn)
-        print(f"Sent opt in transaction with txid: {txId}")
-
-        results = transaction.wait_for_confirmation(algodClient, txId, 4)
-        print(f"Result confirmed in round: {results['confirmed-round']}")
-        
-    except Exception as e:
-        print(f"Error issuing ASA: {e}")
-         
-def atomicTransfer(algodClient, account1, account2, assetId, assetAmount, microAlgosCost):
-    '''Perform atomic transfer'''
-    '''The atomic transfer is similar to a normal transfer function, however it creates a group transaction in which the transfer of both algos
-    from account A to Account B, and the transfer of UCTZAR from account B to Account A take place together with one transactionID generated. 
-        '''
-    assetBalance = None
-    try:
-        param = algodClient.suggested_params()  # Get suggested parameters
-        param.fee = 1000
-        param.flatFee = True
-
-        algosTxn = transaction.PaymentTxn(account1["publicAdress"], param, account2["publicAdress"], microAlgosCost) # Transfer of algos from accountA to accountB
-        assetTxn = transaction.AssetTransferTxn( sender=account2["publicAdress"], sp=param, receiver=account1["publicAdress"], amt=assetAmount, index=assetId) #Transfer of ASA from account2 to account1
-
-        transaction.assign_group_id([algosTxn, assetTxn]) # Assign the group ID to the transaction. This is deterministic based on the order of the transactions in the function; the group ID will change if the two transactions are swapped.
-
-        # Sign transactions
-        sTxn1 = algosTxn.sign(account1["privateKey"])
-        sTxn2 = assetTxn.sign(account2["privateKey"])
-
-        signedGroup = [sTxn1, sTxn2] # Combine the signed transactions
-
-        txId = algodClient.send_transactions(signedGroup) #This ID id the ID for the grouped transaction i.e. atomic swaps.
-
-        
-        results = transaction.wait_for_confirmation(algodClient, txId, 4)  # 4 rounds for verification
-        print("Atomic transfer successful.")
-
-    except Exception as e:
-        print(f"Error in atomic transfer: {e}")
-        
 def main():
 
     #######################################################################################################
     '''Create a new client, configured to connect to a public node''' 
     
-    algod_adress= "http://testnet-api.algonode.cloud"
+    algod_adresses= ["http://testnet-api.algonode.cloud"] # more testnet nodes can be listed to spread reads and fail over
     algod_token = ""
-    algod_client = algod.AlgodClient(algod_token, algod_adress) # instance of client
+    instrumentation = Instrumentation()  # time every request and signature to see where the run spends its time
+    nodeClients = [PooledAlgodClient(algod_token, algod_adress, instrumentation=instrumentation) for algod_adress in algod_adresses] # keep-alive connections with retries; every request is timed with its retries
+    algod_client = MultiNodeAlgodClient(nodeClients) # instance of client, reads by latency and submissions to the healthiest node
+    instrumentation.instrumentSigning()
+    showMnemonics = os.environ.get("SHOW_MNEMONICS") == "1" # secrets are only printed when asked for, e.g. to reload the accounts after funding them
     
     #######################################################################################################
     ''' Generate accounts A & B '''
@@ -164,15 +43,15 @@ def main():
     print("Print account information for confirmation of creation")
     if accountA:
         print("\nAccountA Address:", accountA["publicAdress"])
-        print("AccountA Private Key:", accountA["privateKey"])
-        print("AccountA mnemonic:", accountA["mnemon"])
+        if showMnemonics:
+            print("AccountA mnemonic:", accountA["mnemon"])
     else:
         print("\nFailed to creation AccountA.")
 
     if accountB:
         print("\nAccountB Address:", accountB["publicAdress"])
-        print("AccountB Private Key:", accountB["privateKey"])
-        print("AccountB mnemonic:", accountB["mnemon"])
+        if showMnemonics:
+            print("AccountB mnemonic:", accountB["mnemon"])
     else:
         print("\nFailed to creation AccountB.")
     
@@ -250,6 +129,11 @@ def main():
     '''Check Algos balance for Account A & B after atomic transfer'''   
     print(f"\nAccount A Balance : {accountBalance(accountA, algod_client)} microAlgos")
     print(f"\nAccount B Balance : {accountBalance(accountB, algod_client)} microAlgos")
+
+    printSummary(instrumentation.summary())
+    for nodeClient in nodeClients:
+        print(f"Connection pool {nodeClient.algod_address}: {nodeClient.transportStats()}")
+    print(f"Nodes: {algod_client.poolStats()}")
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+'''Shared helpers used by the Q5.2 atomic transfer and Q6.6 fractional NFT scripts'''
+
+'''Importing the package loads nothing else: every name below is looked up in EXPORTS the first time it is used and
+only then is its submodule imported, together with algosdk, numpy or nacl as that submodule needs them. The name is
+cached in the package afterwards, so the second use costs a plain attribute read. Submodules can still be imported
+directly, `from algo_utils.mint import ASAmint` loads mint and what it imports and nothing more.'''
+
+import importlib
+
+EXPORTS = {
+    "accountGen": "accounts", "loadAccount": "accounts", "Account": "accounts", "AccountBatch": "accounts",
+    "accountBalance": "balances", "assetBalanceCheck": "balances",
+    "ASAmint": "mint", "FracNft": "mint",
+    "optIn": "optin", "bulkOptIn": "bulk_optin",
+    "atomicTransfer": "swap", "SwapBuilder": "swap",
+    "planDistribution": "distribution", "distributeNft": "distribution", "distributeNftBatched": "distribution",
+    "distributeNftResumable": "distribution", "distributeCapTable": "distribution", "checkNftOwn": "distribution",
+    "allocateUnits": "allocation", "checkAllocation": "allocation",
+    "CapTable": "captable", "DistributionJournal": "journal", "HoldingsIndex": "holdings",
+    "HoldingsScanner": "scanner", "getSnapshot": "snapshot", "snapshots": "snapshot", "lookupHoldings": "snapshot",
+    "suggestedParams": "params", "preflight": "preflight", "Preflight": "preflight",
+    "SubmissionEngine": "submission", "SigningStage": "signing", "BlockWatcher": "watcher",
+    "Instrumentation": "instrument", "printSummary": "instrument",
+    "PooledAlgodClient": "transport", "MultiNodeAlgodClient": "nodepool",
+    "FakeAlgod": "fake_algod", "FakeAlgodClient": "fake_algod", "Keystore": "keystore", "generateAccounts": "keystore",
+}
+SUBMODULES = frozenset(EXPORTS.values()) | {"aio"}
+
+__all__ = sorted(EXPORTS)
+
+
+def __getattr__(name):
+    if name in EXPORTS:
+        value = getattr(importlib.import_module(f"{__name__}.{EXPORTS[name]}"), name)
+    elif name in SUBMODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS) | SUBMODULES)
@@ -0,0 +1,142 @@
+'''Command line for the mint, opt-in, swap and distribution workflows
+
+    python -m algo_utils balance ADDRESS [--asset ID]
+    python -m algo_utils mint NAME TOTAL [--fractional] --mnemonic-env CREATOR_MNEMONIC
+    python -m algo_utils optin ASSET_ID --mnemonic-env HOLDER_MNEMONIC
+    python -m algo_utils swap ASSET_ID UNITS MICROALGOS --buyer-env BUYER_MNEMONIC --seller-env SELLER_MNEMONIC
+    python -m algo_utils distribute ASSET_ID CAP_TABLE TOTAL_UNITS --mnemonic-env SENDER_MNEMONIC
+
+Mnemonics are read from the environment variables named on the command line and are never printed. Only argparse is
+imported to parse the arguments, so --help answers at once; algosdk and the workflow module are imported when the
+chosen command runs.
+'''
+import argparse
+import os
+import sys
+
+DEFAULT_NODE = "http://testnet-api.algonode.cloud"
+
+
+def algodClient(args):
+    '''One PooledAlgodClient per --node, spread over a MultiNodeAlgodClient when more than one is given'''
+    from algo_utils.transport import PooledAlgodClient
+
+    clients = [PooledAlgodClient(args.token, node) for node in args.node or [DEFAULT_NODE]]
+    if len(clients) == 1:
+        return clients[0]
+    from algo_utils.nodepool import MultiNodeAlgodClient
+    return MultiNodeAlgodClient(clients)
+
+
+def accountFromEnv(parser, variable):
+    mnemon = os.environ.get(variable)
+    if not mnemon:
+        parser.error(f"environment variable {variable} is not set")
+    from algo_utils.accounts import loadAccount
+    accountName = loadAccount(mnemon)
+    if accountName is None:
+        parser.error(f"environment variable {variable} does not hold a valid mnemonic")
+    return accountName
+
+
+def balance(parser, args):
+    from algo_utils.balances import accountBalance, assetBalanceCheck
+
+    client = algodClient(args)
+    accountName = {"publicAdress": args.address}
+    if args.asset is None:
+        result = accountBalance(accountName, client)
+        if result is not None:
+            print(f"{args.address}: {result} microAlgos")
+        return result
+    result = assetBalanceCheck(client, accountName, args.asset)
+    print(f"{args.address}: {result} units of asset {args.asset}" if result is not None
+          else f"{args.address} is not opted in to asset {args.asset}")
+    return result
+
+
+def mint(parser, args):
+    from algo_utils.mint import ASAmint, FracNft
+
+    creator = accountFromEnv(parser, args.mnemonic_env)
+    issue = FracNft if args.fractional else ASAmint
+    assetId = issue(algodClient(args), creator, args.name, args.total)
+    if assetId is not None:
+        print(assetId)  # last line of the output, for scripts
+    return assetId
+
+
+def optin(parser, args):
+    from algo_utils.optin import optIn
+
+    return optIn(algodClient(args), accountFromEnv(parser, args.mnemonic_env), args.asset)
+
+
+def swap(parser, args):
+    from algo_utils.swap import atomicTransfer
+
+    buyer = accountFromEnv(parser, args.buyer_env)
+    seller = accountFromEnv(parser, args.seller_env)
+    return atomicTransfer(algodClient(args), buyer, seller, args.asset, args.units, args.microalgos)
+
+
+def distribute(parser, args):
+    from algo_utils.distribution import distributeCapTable
+
+    sender = accountFromEnv(parser, args.mnemonic_env)
+    return distributeCapTable(algodClient(args), sender, args.asset, args.cap_table, args.total,
+                              normalize=not args.no_normalize, groupSize=args.group_size, window=args.window)
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog="python -m algo_utils", description=__doc__.splitlines()[0])
+    parser.add_argument("--node", action="append", help=f"algod address, repeat to spread over nodes "
+                                                        f"(default {DEFAULT_NODE})")
+    parser.add_argument("--token", default="", help="algod API token")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("balance", help="algo or asset balance of an address")
+    command.add_argument("address")
+    command.add_argument("--asset", type=int, help="asset id, the algo balance when left out")
+    command.set_defaults(run=balance)
+
+    command = commands.add_parser("mint", help="issue an ASA, or a fractional NFT with --fractional")
+    command.add_argument("name")
+    command.add_argument("total", type=int, help="total units")
+    command.add_argument("--fractional", action="store_true", help="decimals of log10(total) as in ARC-0003")
+    command.add_argument("--mnemonic-env", required=True, metavar="VAR", help="variable holding the creator mnemonic")
+    command.set_defaults(run=mint)
+
+    command = commands.add_parser("optin", help="opt an account in to an asset")
+    command.add_argument("asset", type=int)
+    command.add_argument("--mnemonic-env", required=True, metavar="VAR", help="variable holding the account mnemonic")
+    command.set_defaults(run=optin)
+
+    command = commands.add_parser("swap", help="algos from the buyer for asset units from the seller, atomically")
+    command.add_argument("asset", type=int)
+    command.add_argument("units", type=int)
+    command.add_argument("microalgos", type=int)
+    command.add_argument("--buyer-env", required=True, metavar="VAR", help="variable holding the buyer mnemonic")
+    command.add_argument("--seller-env", required=True, metavar="VAR", help="variable holding the seller mnemonic")
+    command.set_defaults(run=swap)
+
+    command = commands.add_parser("distribute", help="split asset units over a CSV or Parquet cap table")
+    command.add_argument("asset", type=int)
+    command.add_argument("cap_table")
+    command.add_argument("total", type=int, help="units to hand out")
+    command.add_argument("--mnemonic-env", required=True, metavar="VAR", help="variable holding the sender mnemonic")
+    command.add_argument("--no-normalize", action="store_true", help="weights are fractions of total, not shares")
+    command.add_argument("--group-size", type=int, default=16)
+    command.add_argument("--window", type=int, default=64, help="groups in flight")
+    command.set_defaults(run=distribute)
+    return parser
+
+
+def main(argv=None):
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    return 0 if args.run(parser, args) is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
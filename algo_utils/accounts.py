@@ -0,0 +1,156 @@
+import base64
+
+import nacl.signing
+from algosdk import account, encoding, mnemonic
+
+KEY_SIZE = 32
+
+
+class Account:
+    '''Compact account record used in place of the {"privateKey", "publicAdress", "mnemon"} dicts'''
+
+    '''Only the 32-byte public key and the 32-byte signing key seed are stored. The address, the base64 private key
+    the SDK signs with and the mnemonic are computed when they are asked for, so a million accounts do not carry a
+    million mnemonics and address strings. Indexing with the old dict keys still works, account["publicAdress"] and
+    account["privateKey"], so every existing function accepts an Account. repr() never shows a secret.'''
+
+    __slots__ = ("publicKey", "signingKey", "addressCache")
+
+    def __init__(self, publicKey, signingKey):
+        if len(publicKey) != KEY_SIZE or len(signingKey) != KEY_SIZE:
+            raise ValueError("public key and signing key must be 32 bytes")
+        self.publicKey = bytes(publicKey)
+        self.signingKey = bytes(signingKey)
+        self.addressCache = None
+
+    @classmethod
+    def generate(cls):
+        signingKey = nacl.signing.SigningKey.generate()
+        return cls(bytes(signingKey.verify_key), bytes(signingKey))
+
+    @classmethod
+    def fromPrivateKey(cls, privateKey):
+        '''From the base64 private key returned by account.generate_account'''
+        raw = base64.b64decode(privateKey)
+        return cls(raw[KEY_SIZE:], raw[:KEY_SIZE])
+
+    @classmethod
+    def fromMnemonic(cls, mnemon):
+        return cls.fromPrivateKey(mnemonic.to_private_key(mnemon))
+
+    @classmethod
+    def fromDict(cls, accountName):
+        '''From an account dict as built by the scripts'''
+        return cls.fromPrivateKey(accountName["privateKey"])
+
+    @property
+    def address(self):
+        if self.addressCache is None:
+            self.addressCache = encoding.encode_address(self.publicKey)
+        return self.addressCache
+
+    @property
+    def privateKey(self):
+        return base64.b64encode(self.signingKey + self.publicKey).decode()
+
+    @property
+    def mnemon(self):
+        return mnemonic.from_private_key(self.privateKey)
+
+    def __getitem__(self, key):
+        if key == "publicAdress":
+            return self.address
+        if key == "privateKey":
+            return self.privateKey
+        if key == "mnemon":
+            return self.mnemon
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        return isinstance(other, Account) and other.publicKey == self.publicKey
+
+    def __hash__(self):
+        return hash(self.publicKey)
+
+    def __repr__(self):
+        return f"Account({self.address})"
+
+
+class AccountBatch:
+    '''Large sets of accounts kept in two contiguous byte arrays, 64 bytes per account'''
+
+    '''Accounts are only turned into Account objects when they are read, so holding a million of them costs about 64 MB
+    instead of a million dicts of strings. Iterating yields Account records that every existing function accepts.'''
+
+    def __init__(self):
+        self.publicKeys = bytearray()
+        self.signingKeys = bytearray()
+
+    def __len__(self):
+        return len(self.publicKeys) // KEY_SIZE
+
+    def append(self, accountName):
+        '''Add an Account or an account dict'''
+        if not isinstance(accountName, Account):
+            accountName = Account.fromDict(accountName)
+        self.publicKeys += accountName.publicKey
+        self.signingKeys += accountName.signingKey
+
+    def extend(self, accounts):
+        for accountName in accounts:
+            self.append(accountName)
+
+    @classmethod
+    def generate(cls, count):
+        batch = cls()
+        for _ in range(count):
+            signingKey = nacl.signing.SigningKey.generate()
+            batch.publicKeys += bytes(signingKey.verify_key)
+            batch.signingKeys += bytes(signingKey)
+        return batch
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start = i * KEY_SIZE
+        return Account(self.publicKeys[start:start + KEY_SIZE], self.signingKeys[start:start + KEY_SIZE])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def addresses(self):
+        '''Iterate over the addresses without building Account objects'''
+        for start in range(0, len(self.publicKeys), KEY_SIZE):
+            yield encoding.encode_address(bytes(self.publicKeys[start:start + KEY_SIZE]))
+
+    def find(self, address):
+        '''Position of an address in the batch, or -1'''
+        publicKey = encoding.decode_address(address)
+        start = self.publicKeys.find(publicKey)
+        while start != -1 and start % KEY_SIZE:
+            start = self.publicKeys.find(publicKey, start + 1)
+        return start // KEY_SIZE if start != -1 else -1
+
+
+def accountGen():
+    '''Account creation function that will generate a new account key pair with mnemonic'''
+    privateKey, publicAdress = account.generate_account() # Generate account key pair
+    return Account.fromPrivateKey(privateKey)  # Compact record, account["mnemon"] derives the mnemonic to use the same account later
+
+
+def loadAccount(mnemon):
+    '''Load the accounts for recovery purposes and loading accounts with a positive balance via dispensory'''
+    try:
+        return Account.fromMnemonic(mnemon)
+    except Exception as e:
+        print(f"error loading account: {e}")
+        return None
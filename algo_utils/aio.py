@@ -0,0 +1,388 @@
+import asyncio
+import base64
+import copy
+import json
+import ssl
+import time
+from math import log10
+from urllib.parse import urlencode, urlparse
+
+from algosdk import constants, encoding, error, transaction
+
+from algo_utils.allocation import allocateUnits, checkAllocation
+from algo_utils.holdings import HoldingsIndex
+from algo_utils.params import uniqueNote
+
+
+class ConnectionPool:
+    '''Keep-alive HTTP/1.1 connections to one algod node shared by every coroutine'''
+
+    '''At most `maxConnections` requests are on the wire at once. A connection goes back to the idle list after each
+    response unless the node asked to close it, so consecutive requests skip the TCP/TLS setup. A request that fails on
+    a reused connection (closed by the node while idle) is retried once on a fresh one.'''
+
+    def __init__(self, address, maxConnections=32, timeout=30):
+        url = urlparse(address)
+        self.host = url.hostname
+        self.tls = url.scheme == "https"
+        self.port = url.port or (443 if self.tls else 80)
+        self.basePath = url.path.rstrip("/")
+        self.timeout = timeout
+        self.maxConnections = maxConnections
+        self.semaphore = None
+        self.idle = []
+        self.opened = 0
+        self.reused = 0
+
+    async def connect(self):
+        sslContext = ssl.create_default_context() if self.tls else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=sslContext)
+        self.opened += 1
+        return reader, writer
+
+    async def request(self, method, path, headers, body=None):
+        '''Send one request and return (status, body bytes)'''
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.maxConnections)
+
+        async with self.semaphore:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                reader, writer = self.idle.pop() if reused else await self.connect()
+                try:
+                    status, keepAlive, data = await asyncio.wait_for(
+                        self.exchange(reader, writer, method, path, headers, body), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise error.AlgodRequestError(f"Connection to {self.host} failed: {e}")
+                except BaseException:
+                    writer.close()
+                    raise
+
+                if reused:
+                    self.reused += 1
+                if keepAlive:
+                    self.idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, data
+
+    async def exchange(self, reader, writer, method, path, headers, body):
+        lines = [f"{method} {self.basePath}{path} HTTP/1.1", f"Host: {self.host}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Content-Length: {len(body or b'')}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+        await writer.drain()
+
+        statusLine = await reader.readline()
+        if not statusLine:
+            raise ConnectionError("connection closed by node")
+        version, status = statusLine.decode("latin-1").split(" ", 2)[:2]
+
+        respHeaders = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            respHeaders[name.strip().lower()] = value.strip()
+
+        keepAlive = respHeaders.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+        if respHeaders.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in respHeaders:
+            data = await reader.readexactly(int(respHeaders["content-length"]))
+        else:
+            data = await reader.read()
+            keepAlive = False
+        return int(status), keepAlive, data
+
+    def close(self):
+        while self.idle:
+            self.idle.pop()[1].close()
+
+
+class AsyncAlgodClient:
+    '''asyncio version of the algod client methods used by the two scripts'''
+
+    '''Method names follow algod.AlgodClient so the code reads the same, but every call is a coroutine and all of them
+    share one keep-alive ConnectionPool. Suggested params are reused for `paramsMaxAge` seconds and handed out as copies,
+    so every transaction built here carries a uniqueNote() to keep two identical ones from sharing a txid.
+    Confirmations are awaited through one watcher per client: every pending txid is checked once per round and the
+    watcher then waits for the next block, so hundreds of concurrent waits cost one status request per round plus one
+    lookup per pending transaction instead of a polling loop each.'''
+
+    def __init__(self, algod_token, algod_address, maxConnections=32, timeout=30, paramsMaxAge=60):
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.pool = ConnectionPool(algod_address, maxConnections, timeout)
+        self.paramsMaxAge = paramsMaxAge
+        self.params = None
+        self.pending = {}  # txid -> (future, last round to wait for)
+        self.watcher = None
+        self.starting = None
+
+    async def algod_request(self, method, path, params=None, data=None, headers=None):
+        header = {"User-Agent": "py-algorand-sdk", "Accept": "application/json"}
+        if path not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if headers:
+            header.update(headers)
+        if path not in constants.unversioned_paths:
+            path = "/v2" + path
+        if params:
+            path += "?" + urlencode(params)
+
+        status, body = await self.pool.request(method, path, header, data)
+        try:
+            result = json.loads(body) if body else {}
+        except ValueError:
+            if status < 400:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod")
+            result = {"message": body.decode(errors="replace")}
+        if status >= 400:
+            raise error.AlgodHTTPError(result.get("message", result), status, result.get("data"))
+        return result
+
+    async def account_info(self, address):
+        return await self.algod_request("GET", "/accounts/" + address)
+
+    async def status(self):
+        return await self.algod_request("GET", "/status")
+
+    async def status_after_block(self, round_num):
+        return await self.algod_request("GET", f"/status/wait-for-block-after/{round_num}")
+
+    async def pending_transaction_info(self, txid):
+        return await self.algod_request("GET", "/transactions/pending/" + txid, {"format": "json"})
+
+    async def suggested_params(self):
+        if self.params is None or time.monotonic() - self.params[1] > self.paramsMaxAge:
+            res = await self.algod_request("GET", "/transactions/params")
+            param = transaction.SuggestedParams(
+                res["fee"], res["last-round"], res["last-round"] + 1000, res["genesis-hash"], res["genesis-id"],
+                False, res["consensus-version"], res["min-fee"])
+            self.params = (param, time.monotonic())
+        return copy.copy(self.params[0])
+
+    async def send_transactions(self, signedTxns):
+        '''Send a signed transaction or group and return the txid of the first transaction'''
+        if not isinstance(signedTxns, (list, tuple)):
+            signedTxns = [signedTxns]
+        raw = b"".join(base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signedTxns)
+        resp = await self.algod_request("POST", "/transactions", data=raw,
+                                        headers={"Content-Type": "application/x-binary"})
+        return resp["txId"]
+
+    send_transaction = send_transactions
+
+    async def wait_for_confirmation(self, txid, waitRounds=4):
+        '''Await the pending transaction info once the transaction is confirmed'''
+        if self.watcher is None or self.watcher.done():
+            if self.starting is None or self.starting.done():
+                self.starting = asyncio.ensure_future(self.status())  # one status request for every waiter arriving now
+            status = await asyncio.shield(self.starting)
+            if self.watcher is None or self.watcher.done():  # another coroutine may have started it meanwhile
+                self.watchRound = status["last-round"]
+                self.watcher = asyncio.ensure_future(self.watch())
+
+        if txid in self.pending:
+            return await asyncio.shield(self.pending[txid][0])  # already being waited for
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[txid] = (future, self.watchRound + waitRounds)
+        return await future
+
+    async def watch(self):
+        while self.pending:
+            txids = list(self.pending)
+            infos = await asyncio.gather(*[self.pending_transaction_info(txid) for txid in txids],
+                                         return_exceptions=True)
+            for txid, txInfo in zip(txids, infos):
+                future, lastValid = self.pending[txid]
+                if future.done():
+                    del self.pending[txid]
+                elif isinstance(txInfo, Exception):
+                    if not isinstance(txInfo, error.AlgodHTTPError):
+                        del self.pending[txid]
+                        future.set_exception(txInfo)
+                    elif self.watchRound >= lastValid:  # a 404 for a txid the node dropped or never had
+                        del self.pending[txid]
+                        future.set_exception(error.ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out"))
+                elif txInfo.get("pool-error"):
+                    del self.pending[txid]
+                    future.set_exception(error.TransactionRejectedError("Transaction rejected: " + txInfo["pool-error"]))
+                elif txInfo.get("confirmed-round"):
+                    del self.pending[txid]
+                    future.set_result(txInfo)
+                elif self.watchRound >= lastValid:
+                    del self.pending[txid]
+                    future.set_exception(error.ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out"))
+
+            if self.pending:
+                try:
+                    self.watchRound = (await self.status_after_block(self.watchRound))["last-round"]
+                except Exception as e:
+                    for future, _ in self.pending.values():
+                        if not future.done():
+                            future.set_exception(e)
+                    self.pending.clear()
+
+    def close(self):
+        self.pool.close()
+
+
+async def accountBalance(accountName, algodClient):
+    '''Obtain account balance'''
+    try:
+        accountInfo = await algodClient.account_info(accountName["publicAdress"])
+        return accountInfo["amount"]
+    except Exception as e:
+        print(f"Error fetching account balance: {e}")
+        return None
+
+
+async def assetBalanceCheck(algodClient, accountName, assetId):
+    '''Check asset balance for accounts, None when the account does not hold the asset'''
+    try:
+        accountInfo = await algodClient.account_info(accountName["publicAdress"])
+        return HoldingsIndex.fromAccountInfo(accountInfo).amount(assetId)
+    except Exception as e:
+        print(f"Error checking asset balance: {e}")
+        return None
+
+
+async def optIn(algodClient, accountName, assetId):
+    '''Opt in to an asset and return the pending transaction info once confirmed'''
+    try:
+        param = await algodClient.suggested_params()
+        param.fee = 1000
+        param.flat_fee = True
+
+        optinTxn = transaction.AssetOptInTxn(sender=accountName["publicAdress"], sp=param, index=assetId, note=uniqueNote())
+        txId = await algodClient.send_transaction(optinTxn.sign(accountName["privateKey"]))
+        print(f"Sent opt in transaction with txid: {txId}")
+
+        results = await algodClient.wait_for_confirmation(txId, 4)
+        print(f"Result confirmed in round: {results['confirmed-round']}")
+        return results
+
+    except Exception as e:
+        print(f"Error opting in to asset: {e}")
+        return None
+
+
+async def issueAsset(algodClient, accountName, name, total, decimals):
+    param = await algodClient.suggested_params()
+    param.fee = 1000
+    param.flat_fee = True
+
+    balance = (await algodClient.account_info(accountName["publicAdress"]))["amount"]
+    if balance < param.fee:
+        print("Insufficient funds in the account.")
+        return None
+
+    txn = transaction.AssetConfigTxn(
+        sender=accountName["publicAdress"],
+        sp=param,
+        total=total,
+        default_frozen=False,
+        unit_name=name.upper(),
+        asset_name=name.lower(),
+        manager=accountName["publicAdress"],
+        reserve=accountName["publicAdress"],
+        freeze=accountName["publicAdress"],
+        clawback=accountName["publicAdress"],
+        decimals=decimals,
+        note=uniqueNote())
+
+    txid = await algodClient.send_transaction(txn.sign(accountName["privateKey"]))
+    print(f"Asset has been sent with txid: {txid}")
+
+    results = await algodClient.wait_for_confirmation(txid, 4)  # 4 rounds for verification
+    assetId = results["asset-index"]
+    print(f"Asset ID for {name.upper()} : {assetId}")
+    return assetId
+
+
+async def ASAmint(algodClient, accountName, name, totalNumAsset):
+    '''Issue an ASA with no decimals'''
+    try:
+        return await issueAsset(algodClient, accountName, name, totalNumAsset, 0)
+    except Exception as e:
+        print(f"Error issuing ASA: {e}")
+        return None
+
+
+async def FracNft(algodClient, accountName, name, totalUnitAmount):
+    '''Issue a fractional NFT, decimals are log10 of the total units as in ARC-0003'''
+    try:
+        return await issueAsset(algodClient, accountName, name, totalUnitAmount, int(log10(totalUnitAmount)))
+    except Exception as e:
+        print(f"Error issuing fractional NFT: {e}")
+        return None
+
+
+async def atomicTransfer(algodClient, account1, account2, assetId, assetAmount, microAlgosCost):
+    '''Swap algos from account1 for units of the asset from account2 in one group'''
+    try:
+        param = await algodClient.suggested_params()
+        param.fee = 1000
+        param.flat_fee = True
+
+        algosTxn = transaction.PaymentTxn(account1["publicAdress"], param, account2["publicAdress"], microAlgosCost, note=uniqueNote())
+        assetTxn = transaction.AssetTransferTxn(sender=account2["publicAdress"], sp=param, receiver=account1["publicAdress"], amt=assetAmount, index=assetId, note=uniqueNote())
+        transaction.assign_group_id([algosTxn, assetTxn])
+
+        txId = await algodClient.send_transactions([algosTxn.sign(account1["privateKey"]), assetTxn.sign(account2["privateKey"])])
+        results = await algodClient.wait_for_confirmation(txId, 4)  # 4 rounds for verification
+        print("Atomic transfer successful.")
+        return results
+
+    except Exception as e:
+        print(f"Error in atomic transfer: {e}")
+        return None
+
+
+async def distributeNft(algodClient, accountName, assetId, recipients, fractions, totalUnits):
+    '''Send every transfer at once and await all the confirmations together'''
+    try:
+        if len(recipients) != len(fractions):
+            raise ValueError(f"{len(recipients)} recipients but {len(fractions)} fractions")
+        amounts = allocateUnits(fractions, totalUnits).tolist()  # exact largest-remainder split, as planDistribution does
+        checkAllocation(amounts, await assetBalanceCheck(algodClient, accountName, assetId))
+
+        param = await algodClient.suggested_params()
+        param.fee = 1000
+        param.flat_fee = True
+
+        txids = []
+        for recipient, amountSend in zip(recipients, amounts):
+            txn = transaction.AssetTransferTxn(
+                sender=accountName["publicAdress"],
+                sp=param,
+                receiver=recipient["publicAdress"],
+                amt=amountSend,
+                index=assetId,
+                note=uniqueNote())
+            txids.append(algodClient.send_transaction(txn.sign(accountName["privateKey"])))
+        txids = await asyncio.gather(*txids)
+
+        results = await asyncio.gather(*[algodClient.wait_for_confirmation(txid, 4) for txid in txids])
+        for txid, result in zip(txids, results):
+            print(f"Transfer {txid} confirmed in round: {result['confirmed-round']}")
+        return results
+
+    except Exception as e:
+        print(f"Error distributing fractional NFT: {e}")
+        return None
@@ -0,0 +1,110 @@
+from math import log10
+
+import numpy as np
+
+MAX_UNITS = 2 ** 64 - 1  # largest total an asset can have
+INT64_LIMIT = 2 ** 63
+
+
+def exactWeights(weights):
+    '''Integers and a power of two such that weights == integers * 2**scale exactly'''
+    mantissas, exponents = np.frexp(weights)
+    integers = (mantissas * 2.0 ** 53).astype(np.int64)  # exact, a float64 has 53 bits of mantissa
+    exponents = exponents.astype(np.int64) - 53
+    nonzero = integers != 0
+    if not nonzero.any():
+        return np.zeros(len(weights), dtype=np.int64), 0
+
+    # drop the trailing zero bits so whole numbers stay small: 3.0 is 3 * 2**0, not 0.75 * 2**53 * 2**-51
+    lowestBits = np.where(nonzero, integers & -integers, 1)
+    trailing = np.log2(lowestBits).astype(np.int64)  # exact, every lowest bit is a power of two below 2**53
+    integers >>= trailing
+    exponents += trailing
+    scale = int(exponents[nonzero].min())
+    shifts = np.where(nonzero, exponents - scale, 0)
+
+    bits = np.where(nonzero, np.log2(np.maximum(integers, 1)).astype(np.int64) + 1, 0)
+    if int((bits + shifts).max()) < 63:
+        return integers << shifts, scale
+    return np.array([int(n) << int(s) for n, s in zip(integers.tolist(), shifts.tolist())], dtype=object), scale
+
+
+def allocateUnits(weights, totalUnits, decimals=None, normalize=False):
+    '''Exact integer allocation of asset units by largest-remainder rounding'''
+
+    '''`weights` are the fractions of the asset each recipient should get, as in distributeNft (0.40 is 40% of
+    totalUnits); what is not allocated stays with the sender. With normalize=True the weights are relative (share
+    counts from a cap table, say) and the whole of totalUnits is allocated.
+
+    The number of units to hand out is the sum of the weights times totalUnits, rounded to whole units, i.e. to the
+    `decimals` of the asset (log10 of the total units as in FracNft when not given). Every recipient first gets the
+    floor of its exact share and the units left over go one each to the largest remainders, ties going to the earlier
+    recipient. So the allocations always add up to that total and no share is silently truncated the way
+    int(0.29 * 100) == 28 is.
+
+    The arithmetic is exact for any total an asset can have (up to 2**64 - 1): every float weight is an integer times
+    a power of two, so the shares are taken as integer floors and remainders of those integers times totalUnits. The
+    arrays stay int64 and vectorized while the products fit, a 100k-recipient table takes milliseconds, and fall back
+    to Python integers above that, where remainders within one part in 2**53 of each other count as a tie. Returns a
+    uint64 array in the order of the weights.'''
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1:
+        raise ValueError("weights must be a one dimensional sequence")
+    totalUnits = int(totalUnits)
+    if not 0 < totalUnits <= MAX_UNITS:
+        raise ValueError(f"totalUnits must be between 1 and {MAX_UNITS}")
+    if weights.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+        raise ValueError("weights must be finite and not negative")
+
+    if decimals is None:
+        decimals = int(log10(totalUnits))
+    integers, scale = exactWeights(weights)
+    integerSum = int(np.sum(integers, dtype=object))
+
+    if normalize:
+        if integerSum == 0:
+            raise ValueError("weights add up to zero")
+        multiplier, denominator = totalUnits, integerSum  # share i is integers[i] * totalUnits / integerSum
+        toAllocate = totalUnits
+    else:
+        # fractions are only meaningful up to the precision of the asset, 10**-decimals of the whole
+        weightSum = float(np.sum(weights))
+        tolerance = max(10.0 ** -decimals, 1.0 / totalUnits) / 2
+        if weightSum > 1 + tolerance:
+            raise ValueError(f"fractions add up to {weightSum}, more than the whole asset")
+        multiplier, denominator = (totalUnits, 2 ** -scale) if scale < 0 else (totalUnits << scale, 1)
+        toAllocate = min(totalUnits, (2 * integerSum * multiplier + denominator) // (2 * denominator))  # rounded
+
+    if int(integers.max()) * multiplier >= INT64_LIMIT or denominator >= INT64_LIMIT:
+        integers = integers.astype(object)  # Python integers, exact at any size
+    numerators = integers * multiplier
+    units = numerators // denominator
+    remainders = numerators % denominator
+    leftOver = toAllocate - int(np.sum(units, dtype=object))
+    if remainders.dtype == object:
+        # ranked as floats, sorting Python integers is ten times slower; the units still add up exactly
+        remainders = (remainders / denominator).astype(np.float64)
+
+    if leftOver > 0:
+        order = np.argsort(-remainders, kind="stable")  # largest remainder first, earlier recipient on ties
+        units[order[:leftOver]] += 1
+    elif leftOver < 0:
+        # fractions a little over the whole within the tolerance, take back from the smallest remainders
+        order = np.argsort(remainders, kind="stable")
+        order = order[units[order] > 0][:-leftOver]
+        units[order] -= 1
+
+    return units.astype(np.uint64)
+
+
+def checkAllocation(units, senderHolding):
+    '''Raise ValueError unless the sender holds enough units for the whole allocation'''
+    needed = int(np.sum(units, dtype=object))  # Python integers, a sum of uint64 units can pass 2**64
+    if senderHolding is None:
+        raise ValueError("the sender is not opted in to the asset")
+    if needed > senderHolding:
+        raise ValueError(f"allocation needs {needed} units but the sender holds {senderHolding}")
+    return needed
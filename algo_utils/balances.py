@@ -0,0 +1,23 @@
+from algo_utils.snapshot import getSnapshot
+
+
+def accountBalance(accountName, algodClient): 
+    '''Obtain account balance'''
+    try:
+        accountBalance = getSnapshot(algodClient, accountName["publicAdress"]).balance()  # shared snapshot, one account_info per account
+        return accountBalance
+    except Exception as e:
+        print(f"Error fetching account balance: {e}")
+        return None
+
+
+def assetBalanceCheck(algodClient, accountName, assetId) :
+    '''Check asset balance for accounts, None when the account is not opted in to the asset (0 is an empty holding)'''
+    try : 
+        assetBalance = getSnapshot(algodClient, accountName["publicAdress"]).assetAmount(assetId)  # holdings are indexed by asset-id
+        return assetBalance
+    
+    except Exception as e:
+        
+        print(f"Error checking asset balance: {e}")
+        return None
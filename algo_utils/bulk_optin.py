@@ -0,0 +1,114 @@
+import copy
+
+from algosdk import transaction
+
+from algo_utils.params import suggestedParams
+from algo_utils.preflight import Preflight
+from algo_utils.snapshot import lookupHoldings, snapshots
+from algo_utils.submission import SubmissionEngine
+
+
+def bulkOptIn(algodClient, accounts, assetId, sponsor=None, groupSize=16, maxWorkers=8, window=64):
+    '''Opt many accounts in to an asset with grouped transactions'''
+
+    '''The holdings of every account are looked up once through lookupHoldings and accounts that are already opted
+    in are skipped. The remaining AssetOptInTxns are packed into atomic groups of up to `groupSize` (at most 16) and
+    sent through a SubmissionEngine, so onboarding takes a number of rounds rather than one wait per account.
+    When a sponsor account is given, each group starts with a zero-amount payment from the sponsor to itself that
+    carries the fee for the whole group (fee pooling), and the opt-ins are sent with a fee of 0, so the new holders
+    only need their min-balance. A group is atomic, so one bad account would fail its whole group: every group is
+    run through a Preflight before it is signed, reading the snapshots the lookup already fetched, and the members it
+    names, e.g. an account that can not cover the min-balance of the opt-in, are left out and failed with the reason
+    before the rest of the group is checked again.
+
+    Returns {address: outcome} where outcome is a dict with a "status" of "already-opted-in", "opted-in" or
+    "failed", plus the "txid" and "round" of the group or the "error".'''
+
+    groupSize = max(2 if sponsor else 1, min(groupSize, 16))
+    outcomes = {}
+    byAddress = {account["publicAdress"]: account for account in accounts}
+
+    """ One holdings lookup per account to skip the accounts already opted in"""
+    toOptIn = []
+    holdings = lookupHoldings(algodClient, [(address, assetId) for address in byAddress], maxWorkers)
+    for (address, _), holding in holdings.items():
+        if isinstance(holding, Exception):
+            outcomes[address] = {"status": "failed", "error": str(holding)}
+        elif holding is not None:
+            outcomes[address] = {"status": "already-opted-in"}
+        else:
+            toOptIn.append(byAddress[address])
+
+    if not toOptIn:
+        return outcomes
+
+    try:
+        param = suggestedParams(algodClient)
+        param.flat_fee = True
+    except Exception as e:
+        print(f"Error fetching suggested params: {e}")
+        for account in toOptIn:
+            outcomes[account["publicAdress"]] = {"status": "failed", "error": str(e)}
+        return outcomes
+
+    perGroup = groupSize - 1 if sponsor else groupSize
+    engine = SubmissionEngine(algodClient, window=window, waitRounds=4)
+    preflight = Preflight(algodClient)
+    submitted = []
+
+    def buildGroup(members):
+        txns = []
+        keys = []
+        if sponsor:
+            feeParam = copy.copy(param)
+            feeParam.fee = 1000 * (len(members) + 1)  # pays for the whole group
+            txns.append(transaction.PaymentTxn(sponsor["publicAdress"], feeParam, sponsor["publicAdress"], 0))
+            keys.append(sponsor["privateKey"])
+
+        memberParam = copy.copy(param)
+        memberParam.fee = 0 if sponsor else 1000
+        for account in members:
+            txns.append(transaction.AssetOptInTxn(sender=account["publicAdress"], sp=memberParam, index=assetId))
+            keys.append(account["privateKey"])
+        return txns, keys
+
+    """ Send every group before waiting for any of them"""
+    for start in range(0, len(toOptIn), perGroup):
+        members = toOptIn[start:start + perGroup]
+        try:
+            txns, keys = buildGroup(members)
+            problems = preflight.check(txns)
+            named = {account["publicAdress"]: [problem for problem in problems if account["publicAdress"] in problem]
+                     for account in members}
+            named = {address: reasons for address, reasons in named.items() if reasons}
+            if named and len(named) < len(members):
+                for address, reasons in named.items():
+                    outcomes[address] = {"status": "failed", "error": "; ".join(reasons)}
+                members = [account for account in members if account["publicAdress"] not in named]
+                txns, keys = buildGroup(members)
+                problems = preflight.check(txns)
+            if problems:
+                raise ValueError(f"group would be rejected: {'; '.join(problems)}")
+
+            transaction.assign_group_id(txns)
+            signedGroup = [txn.sign(key) for txn, key in zip(txns, keys)]
+            submitted.append((members, engine.submit(signedGroup)))
+        except Exception as e:
+            for account in members:
+                outcomes[account["publicAdress"]] = {"status": "failed", "error": str(e)}
+
+    """ Confirm all groups in one pass"""
+    engine.waitAll()
+    for members, future in submitted:
+        try:
+            results = future.result()
+            outcome = {"status": "opted-in", "txid": future.txid, "round": results["confirmed-round"]}
+        except Exception as e:
+            outcome = {"status": "failed", "txid": getattr(future, "txid", None), "error": str(e)}
+        for account in members:
+            outcomes[account["publicAdress"]] = dict(outcome)
+
+    snapshots.invalidate(*[account["publicAdress"] for account in toOptIn])
+    if sponsor:
+        snapshots.invalidate(sponsor["publicAdress"])
+    return outcomes
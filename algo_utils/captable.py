@@ -0,0 +1,125 @@
+import csv
+import os
+import time
+
+import numpy as np
+from algosdk import encoding
+
+
+class CapTable:
+    '''Streams (address, weight) rows from a CSV or Parquet cap-table export in chunks'''
+
+    '''Rows are read lazily, `chunkSize` at a time, and every chunk is validated before it is handed on: the address
+    must be a valid Algorand address (checksum included) and the weight a finite number that is not negative. Bad
+    rows are counted and the first `keepErrors` of them are kept in `errors` as (row, reason); they never stop the
+    read. A table can be read any number of times and yields the same valid rows each time, so a caller can take the
+    weights in a first pass and the addresses in a second one without holding both. Progress is printed every
+    `reportEvery` rows with the rows per second. Parquet files need pyarrow.'''
+
+    def __init__(self, path, addressColumn="address", weightColumn="weight", chunkSize=50000, reportEvery=500000,
+                 keepErrors=100):
+        self.path = path
+        self.addressColumn = addressColumn
+        self.weightColumn = weightColumn
+        self.chunkSize = chunkSize
+        self.reportEvery = reportEvery
+        self.keepErrors = keepErrors
+        self.rows = 0
+        self.valid = 0
+        self.invalid = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    def rowsPerSec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def rawChunks(self):
+        '''(addresses, weight strings or numbers) as stored in the file'''
+        if os.path.splitext(self.path)[1].lower() in (".parquet", ".pq"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("reading Parquet cap tables needs pyarrow: pip install pyarrow")
+            for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunkSize,
+                                                                columns=[self.addressColumn, self.weightColumn]):
+                yield batch.column(0).to_pylist(), batch.column(1).to_pylist()
+            return
+
+        with open(self.path, newline="") as f:
+            reader = csv.reader(f)
+            header = [column.strip() for column in next(reader, [])]
+            for column in (self.addressColumn, self.weightColumn):
+                if column not in header:
+                    raise ValueError(f"{self.path} has no {column!r} column")
+            addressAt = header.index(self.addressColumn)
+            weightAt = header.index(self.weightColumn)
+            width = max(addressAt, weightAt) + 1
+
+            addresses = []
+            weights = []
+            for row in reader:
+                if len(row) < width:
+                    addresses.append(None)
+                    weights.append(None)
+                else:
+                    addresses.append(row[addressAt].strip())
+                    weights.append(row[weightAt])
+                if len(addresses) == self.chunkSize:
+                    yield addresses, weights
+                    addresses = []
+                    weights = []
+            if addresses:
+                yield addresses, weights
+
+    def reject(self, row, reason):
+        self.invalid += 1
+        if len(self.errors) < self.keepErrors:
+            self.errors.append((row, reason))
+
+    def chunks(self):
+        '''Yield (valid addresses, float64 weights) a chunk at a time'''
+        self.rows = self.valid = self.invalid = 0
+        self.errors = []
+        start = time.perf_counter()
+        nextReport = self.reportEvery
+
+        for rawAddresses, rawWeights in self.rawChunks():
+            addresses = []
+            weights = []
+            for address, weight in zip(rawAddresses, rawWeights):
+                self.rows += 1
+                if not isinstance(address, str):
+                    self.reject(self.rows, "missing address")
+                    continue
+                if not encoding.is_valid_address(address):
+                    self.reject(self.rows, f"invalid address {address!r}")
+                    continue
+                try:
+                    weight = float(weight)
+                except (TypeError, ValueError):
+                    self.reject(self.rows, f"invalid weight {weight!r}")
+                    continue
+                if not np.isfinite(weight) or weight < 0:
+                    self.reject(self.rows, f"invalid weight {weight!r}")
+                    continue
+                addresses.append(address)
+                weights.append(weight)
+
+            self.valid += len(addresses)
+            self.elapsed = time.perf_counter() - start
+            if self.reportEvery and self.rows >= nextReport:
+                print(f"Read {self.rows} rows of {self.path} ({self.invalid} invalid), {self.rowsPerSec():.0f} rows/sec")
+                nextReport += self.reportEvery
+            if addresses:
+                yield addresses, np.array(weights, dtype=np.float64)
+
+        self.elapsed = time.perf_counter() - start
+
+    def weights(self):
+        '''Every valid weight in one float64 array, 8 bytes per row'''
+        return np.concatenate([weights for addresses, weights in self.chunks()] or [np.zeros(0)])
+
+    def addressChunks(self):
+        '''Valid addresses a chunk at a time, in the same order as weights()'''
+        for addresses, weights in self.chunks():
+            yield addresses
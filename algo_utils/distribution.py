@@ -0,0 +1,337 @@
+import base64
+import time
+
+from algosdk import transaction
+
+from algo_utils.allocation import allocateUnits, checkAllocation
+from algo_utils.captable import CapTable
+from algo_utils.journal import DistributionJournal
+from algo_utils.params import suggestedParams, uniqueNote
+from algo_utils.preflight import Preflight
+from algo_utils.scanner import HoldingsScanner
+from algo_utils.snapshot import getSnapshot, snapshots
+from algo_utils.submission import SubmissionEngine
+
+
+def planDistribution(algodClient, accountName, assetId, recipients, fractions, totalUnits, fee=1000):
+    '''Work out how many units each recipient gets and check that the sender holds them and can pay the fees, before any transaction is built'''
+    if len(recipients) != len(fractions):
+        raise ValueError(f"{len(recipients)} recipients but {len(fractions)} fractions")
+    amounts = allocateUnits(fractions, totalUnits)  # exact largest-remainder split, decimals from log10 as in FracNft
+    sender = getSnapshot(algodClient, accountName["publicAdress"])
+    checkAllocation(amounts, sender.assetAmount(assetId))
+    fees = fee * len(amounts)
+    if sender.balance() - fees < sender.minBalance():
+        raise ValueError(f"the sender cannot pay {fees} microAlgos of fees and keep its min-balance of {sender.minBalance()}")
+    return amounts.tolist()
+
+
+def distributeNft(algodClient, accountName, assetId, recipients, fractions, totalUnits, window=16, watcher=None):
+    '''Distribute Fractional NFT to Recipients'''
+
+    '''The function begins by obtaining suggested transaction parameters (param) and setting the transaction fee.
+    The function enters a loop to distribute fractional NFTs to each recipient(the list set in the main function). 
+    The loop iterates over the recipients and fractions lists simultaneously using zip. For each recipient, 
+    it sends the amount of the fractional NFT worked out up front by planDistribution from the specified fraction and the total number of units. It creates an 
+    asset transfer transaction (txn) for each distribution, specifying the sender, receiver, amount to send, asset ID, and transaction parameters.
+    The transaction is signed with the private key of the sender's account (accountName["privateKey"]) and sent to the Algorand network.
+    The transactions are sent through a SubmissionEngine so that up to `window` of them are in flight at once, and the confirmations are 
+    collected together afterwards from the txids of each new block, through the BlockWatcher given or one of the engine's own. The function prints the transaction details, including the transaction ID (txid) and the 
+    round in which the transaction was confirmed. If any exception occurs during the process, an error message is printed.
+    Every transfer is run through a Preflight before anything is signed, and a transfer the node would reject, e.g. to
+    a recipient that is not opted in, is skipped and printed with the reason instead of being sent.'''
+
+    try:
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+
+        amounts = planDistribution(algodClient, accountName, assetId, recipients, fractions, totalUnits)
+        engine = SubmissionEngine(algodClient, window=window, waitRounds=4, watcher=watcher)  # 4 rounds for verification
+        futures = []
+
+        txns = [transaction.AssetTransferTxn(
+                    sender=accountName["publicAdress"],
+                    sp=param,
+                    receiver=recipient['publicAdress'],
+                    amt=amountSend,
+                    index=assetId,
+                    note=uniqueNote())
+                for recipient, amountSend in zip(recipients, amounts)]
+        rejected = Preflight(algodClient).checkBatch([[txn] for txn in txns])
+
+        """ Distribute Fractional NFT to recipients"""
+        for n, (recipient, fraction, txn) in enumerate(zip(recipients, fractions, txns)):
+            if n in rejected:
+                print(f"Skipped {fraction} fractional NFTs to {recipient['publicAdress']}: {'; '.join(rejected[n])}")
+                continue
+            stxn = txn.sign(accountName["privateKey"])
+            future = engine.submit(stxn)
+            futures.append(future)
+            print(f"Sent {fraction} fractional NFTs to {recipient['publicAdress']} with txid: {getattr(future, 'txid', None)}")
+
+        engine.waitAll()
+        snapshots.invalidate(accountName["publicAdress"], *[recipient["publicAdress"] for recipient in recipients])
+        for future in futures:
+            results = future.result()
+            print(f"Result confirmed in round: {results['confirmed-round']}")
+
+    except Exception as e:
+        print(f"Error distributing fractional NFT: {e}")
+
+
+def distributeNftBatched(algodClient, accountName, assetId, recipients, fractions, totalUnits, groupSize=16,
+                         signingStage=None, window=64, watcher=None):
+    '''Distribute Fractional NFT to Recipients in atomic groups'''
+
+    '''Batched version of distributeNft. The asset transfers are packed into groups of up to groupSize (16 is the
+    maximum group size allowed by the network) and each group is given a group ID with transaction.assign_group_id,
+    the same as in the atomic transfer. The groups go out through a SubmissionEngine, up to `window` of them in
+    flight, and are confirmed together from the txids of each new block by the BlockWatcher given or one of the
+    engine's own, so the payout takes a number of rounds rather than one wait per recipient.
+    Every group is built before any is signed; with a SigningStage the signing is spread over its worker processes
+    and the signed groups are sent as raw bytes, otherwise each transaction is signed here. The built groups are run
+    through Preflight.checkBatch first, and a group the node would reject is skipped and printed with the reason.
+
+    Returns one outcome per group, in order: a dict with its "receivers", the "txid" of its first transaction and a
+    "status" of "confirmed" (with the "round"), "failed" or "rejected" (with the "error"), or "unsent" for the groups
+    an error stopped before they went out. The groups already sent are still confirmed and the accounts invalidated
+    after such an error, so the caller can tell who was paid. None when nothing could be sent.'''
+
+    groupSize = max(1, min(groupSize, 16))  # a group can hold at most 16 transactions
+    outcomes = []
+    futures = {}  # group position -> Future of the group sent
+    try:
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+
+        amounts = planDistribution(algodClient, accountName, assetId, recipients, fractions, totalUnits)
+        transfers = list(zip(recipients, amounts))
+
+        groups = []
+        for start in range(0, len(transfers), groupSize):
+            txns = []
+            for recipient, amountSend in transfers[start:start + groupSize]:
+                txns.append(transaction.AssetTransferTxn(
+                    sender=accountName["publicAdress"],
+                    sp=param,
+                    receiver=recipient['publicAdress'],
+                    amt=amountSend,
+                    index=assetId,
+                    note=uniqueNote()))
+
+            transaction.assign_group_id(txns)
+            groups.append(txns)
+            outcomes.append({"receivers": [txn.receiver for txn in txns], "txid": txns[0].get_txid(),
+                             "status": "unsent"})
+
+        rejected = Preflight(algodClient).checkBatch(groups)
+        for n in sorted(rejected):
+            outcomes[n].update(status="rejected", error="; ".join(rejected[n]))
+            print(f"Skipped group of {len(groups[n])} fractional NFT transfers: {'; '.join(rejected[n])}")
+        toSend = [n for n in range(len(groups)) if n not in rejected]
+        engine = SubmissionEngine(algodClient, window=window, waitRounds=4, watcher=watcher)  # 4 rounds for verification
+
+        """ Send every group before waiting for any of them"""
+        if signingStage is not None:
+            for n, blob in zip(toSend, signingStage.signGroups([groups[n] for n in toSend])):
+                futures[n] = engine.submitRaw(blob)
+                print(f"Sent group of {len(groups[n])} fractional NFT transfers with txid: {outcomes[n]['txid']}")
+        else:
+            for n in toSend:
+                futures[n] = engine.submit([txn.sign(accountName["privateKey"]) for txn in groups[n]])
+                print(f"Sent group of {len(groups[n])} fractional NFT transfers with txid: {outcomes[n]['txid']}")
+
+    except Exception as e:
+        print(f"Error distributing fractional NFT: {e}")
+        if not futures:
+            return None
+
+    """ Confirm all groups that went out in one pass"""
+    engine.waitAll()
+    for n, future in futures.items():
+        try:
+            results = future.result()
+            outcomes[n].update(status="confirmed", round=results["confirmed-round"])
+            print(f"Group {outcomes[n]['txid']} confirmed in round: {results['confirmed-round']}")
+        except Exception as e:
+            outcomes[n].update(status="failed", error=str(e))
+            print(f"Group {outcomes[n]['txid']} failed: {e}")
+
+    snapshots.invalidate(accountName["publicAdress"], *[recipient["publicAdress"] for recipient in recipients])
+    return outcomes
+
+
+def distributeNftResumable(algodClient, accountName, assetId, recipients, fractions, totalUnits, journalPath, window=16,
+                           validRounds=50, watcher=None):
+    '''Distribute Fractional NFT to Recipients, carrying on from where an interrupted run stopped'''
+
+    '''The run is written to a DistributionJournal at journalPath. The first run plans every transfer into it; a rerun
+    with the same journal ignores recipients and fractions, settles the transfers that were sent but not recorded as
+    confirmed, and only sends what was never sent or can no longer be confirmed. Each window of transactions is
+    recorded as sent, with its txids, before it goes out, and an entry is only sent again once the node reported it
+    dropped from the pool or its last valid round has passed without it in a block, so neither a crash nor a submit
+    error that hides a transfer which went through leads to a recipient being paid twice. The transactions are only
+    valid for `validRounds` rounds from params fetched for the run, which bounds how long a restart waits to find out
+    whether a transfer in flight went through; the entry number is in the note so every transfer has its own txid.
+    Returns the number of transfers in each state.'''
+
+    journal = None
+    try:
+        journal = DistributionJournal(journalPath, accountName["publicAdress"], assetId)
+        if len(journal) == 0:
+            amounts = planDistribution(algodClient, accountName, assetId, recipients, fractions, totalUnits)
+            journal.plan([recipient["publicAdress"] for recipient in recipients], amounts)
+            print(f"Planned {len(journal)} fractional NFT transfers in {journalPath}")
+        else:
+            checked = journal.reconcile(algodClient)  # only the entries left unconfirmed are looked at
+            print(f"Resuming {journalPath}: settled {checked} unconfirmed transfers, {journal.counts()}")
+
+        param = algodClient.suggested_params()  # not the shared cache, whose first round can be hundreds of rounds old
+        param.fee = journal.fee
+        param.flat_fee = True
+        param.last = param.first + validRounds
+
+        engine = SubmissionEngine(algodClient, window=window, waitRounds=validRounds, watcher=watcher)
+        toSend = journal.toSend()
+
+        def recordOutcome(future, entry):
+            if future.exception() is None:
+                journal.confirmed(entry, future.result()["confirmed-round"])
+            # anything else stays sent, even a 400: "already in ledger" after a failover means it went through.
+            # reconcile settles it from the pool or the blocks of its validity window
+
+        """ Write ahead: each window is in the journal before it is sent"""
+        for start in range(0, len(toSend), window):
+            signedTxns = []
+            for entry in toSend[start:start + window]:
+                txn = transaction.AssetTransferTxn(
+                    sender=accountName["publicAdress"],
+                    sp=param,
+                    receiver=journal.receiver(entry),
+                    amt=journal.amounts[entry],
+                    index=assetId,
+                    note=f"distribution entry {entry}".encode())
+                signedTxns.append((entry, txn.sign(accountName["privateKey"])))
+            journal.sent([(entry, stxn.get_txid(), param.first, param.last) for entry, stxn in signedTxns])
+
+            for entry, stxn in signedTxns:
+                future = engine.submit(stxn)
+                future.add_done_callback(lambda f, entry=entry: recordOutcome(f, entry))
+
+        engine.waitAll()
+        if journal.unconfirmed():
+            journal.reconcile(algodClient)
+        snapshots.invalidate(accountName["publicAdress"], *[journal.receiver(entry) for entry in toSend])
+        counts = journal.counts()
+        print(f"Distribution {journalPath}: {counts}")
+        return counts
+
+    except Exception as e:
+        print(f"Error distributing fractional NFT: {e}")
+        return None
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def distributeCapTable(algodClient, accountName, assetId, capTablePath, totalUnits, normalize=True, groupSize=16,
+                       window=64):
+    '''Distribute Fractional NFT to the holders in a CSV or Parquet cap table, streaming the rows'''
+
+    '''The table is read twice through a CapTable, a chunk at a time. The first pass validates the rows and keeps only
+    the weights, which allocateUnits splits exactly as for distributeNft (with normalize=True the weights are share
+    counts and the whole of totalUnits is handed out); the second pass reads the addresses again and turns each chunk
+    straight into atomic groups of up to groupSize transfers sent through a SubmissionEngine. Memory is 16 bytes per
+    row for the weights and units plus one chunk of rows and `window` groups in flight, however long the table is.
+    Rows with zero units are skipped. The groups of each chunk are run through one Preflight carried over the whole
+    table, and a group the node would reject, e.g. with a holder that is not opted in, is counted as rejected and not
+    sent. Returns the numbers of rows, transfers confirmed, failed and rejected.'''
+
+    groupSize = max(1, min(groupSize, 16))
+    outcome = {"rows": 0, "invalidRows": 0, "confirmed": 0, "failed": 0, "rejected": 0}
+    try:
+        table = CapTable(capTablePath)
+        amounts = allocateUnits(table.weights(), totalUnits, normalize=normalize)  # first pass, weights only
+        outcome["rows"], outcome["invalidRows"] = table.rows, table.invalid
+        print(f"Read {table.valid} holders from {capTablePath} in {table.elapsed:.2f}s "
+              f"({table.rowsPerSec():.0f} rows/sec, {table.invalid} invalid rows)")
+        checkAllocation(amounts, getSnapshot(algodClient, accountName["publicAdress"]).assetAmount(assetId))
+
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+        engine = SubmissionEngine(algodClient, window=window, waitRounds=4)
+        preflight = Preflight(algodClient)
+
+        def countOutcome(future, size):
+            outcome["confirmed" if future.exception() is None else "failed"] += size
+
+        """ Second pass: every chunk of addresses goes straight into groups"""
+        position = 0
+        start = time.perf_counter()
+        for addresses in table.addressChunks():
+            units = amounts[position:position + len(addresses)].tolist()
+            position += len(addresses)
+            transfers = [(address, amountSend) for address, amountSend in zip(addresses, units) if amountSend]
+            groups = []
+            for first in range(0, len(transfers), groupSize):
+                txns = [transaction.AssetTransferTxn(sender=accountName["publicAdress"], sp=param, receiver=address,
+                                                     amt=amountSend, index=assetId, note=uniqueNote())
+                        for address, amountSend in transfers[first:first + groupSize]]
+                transaction.assign_group_id(txns)
+                groups.append(txns)
+            rejected = preflight.checkBatch(groups)
+            preflight.forget(address for address in addresses if address != accountName["publicAdress"])
+
+            for n, txns in enumerate(groups):
+                if n in rejected:
+                    outcome["rejected"] += len(txns)
+                    print(f"Skipped group of {len(txns)} transfers: {'; '.join(rejected[n])}")
+                    continue
+                future = engine.submit([txn.sign(accountName["privateKey"]) for txn in txns])
+                future.add_done_callback(lambda f, size=len(txns): countOutcome(f, size))
+            seconds = time.perf_counter() - start
+            print(f"Sent transfers for {position} of {len(amounts)} holders, {position / seconds:.0f} rows/sec")
+
+        engine.waitAll()
+        snapshots.clear()  # too many holders to invalidate one by one
+        print(f"Distribution from {capTablePath}: {outcome}")
+        return outcome
+
+    except Exception as e:
+        print(f"Error distributing fractional NFT: {e}")
+        return None
+
+
+def checkNftOwn(algodClient, assetId, recipients, maxWorkers=8):
+        '''Check asset balance for accounts'''
+
+        '''The accounts are fetched concurrently by a HoldingsScanner and printed as soon as each one arrives, so the order
+        of the output can differ from the order of the recipients. Returns the {address: amount} map for the asset.'''
+        print("\n")
+        holdings = {}
+        try : 
+            scanner = HoldingsScanner(algodClient, assetId, maxWorkers)
+            for address, balAsset in scanner.scan(recipient['publicAdress'] for recipient in recipients):
+            
+                if isinstance(balAsset, Exception):
+                    print(f"Error checking asset balance for {address}: {balAsset}")
+                    continue
+
+                holdings[address] = balAsset
+                if balAsset is None:
+                    print(f"Adress: {address} is not opted in to asset ID {assetId}.")  # not the same as holding 0 units
+                elif balAsset :
+                    print(f"Adress: {address} has {balAsset} units of asset ID {assetId}")
+                else:
+                    print(f"Adress: {address} does not hold any units of the fractional NFT.")
+
+            print(f"Checked {scanner.scanned} accounts in {scanner.elapsed:.2f}s ({scanner.throughput():.1f} accounts/sec)")
+        
+        except Exception as e:
+            
+            print(f"Error checking asset balance: {e}")
+
+        return holdings
@@ -0,0 +1,360 @@
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import msgpack
+from algosdk import encoding, error, transaction
+from algosdk.v2client import algod
+
+GENESIS_HASH = base64.b64encode(b"fake-algod-genesis-hash-32bytes!").decode()
+GENESIS_ID = "fakenet-v1"
+MIN_FEE = 1000
+MIN_BALANCE = 100000  # per account and again per asset held
+
+
+class FakeAlgod:
+    '''In-process stand-in for the algod endpoints the scripts use'''
+
+    '''Keeps a small ledger of accounts and assets in memory. Rounds close every `roundTime` seconds of wall clock and
+    every transaction in the pool is confirmed in the next round to close. Submitted groups are checked the way the
+    node would reject them (fees including fee pooling, algo and asset balances, min-balance, opt-ins) and applied
+    straight away; signatures are not verified. Simulate requests are checked the same way without being applied.
+    Every request sleeps for `latency` seconds and is counted per endpoint in `calls`; with an `errorRate` that share of
+    requests fails with a 503 before being handled. The time between a submission and the first request that
+    observes any transaction of its group as confirmed is recorded, which gives the confirmation latency seen by the
+    client.'''
+
+    def __init__(self, roundTime=0.05, latency=0.0, startRound=1000, errorRate=0.0, seed=None):
+        self.roundTime = roundTime
+        self.latency = latency
+        self.errorRate = errorRate
+        self.random = random.Random(seed)
+        self.startRound = startRound
+        self.started = time.monotonic()
+        self.round = startRound
+        self.lock = threading.Lock()
+        self.accounts = {}  # address -> {"amount": int, "assets": {assetId: {"amount", "is-frozen"}}}
+        self.assets = {}  # assetId -> asset params
+        self.nextAssetId = 1001
+        self.pool = []  # txids waiting for the next round
+        self.txns = {}  # txid -> pending transaction info
+        self.groupOf = {}  # txid -> txid of the first transaction of its group
+        self.submittedAt = {}  # first txid of a group -> submission time
+        self.observed = {}  # first txid of a group -> confirmation latency seen by the client
+        self.blockTxids = {}  # round -> txids confirmed in that round
+        self.calls = {}
+        self.bytesIn = 0
+
+    def fund(self, address, amount):
+        '''Give an account microAlgos, like the testnet dispenser'''
+        with self.lock:
+            self.account(address)["amount"] += amount
+
+    def createAsset(self, creator, total, decimals=0):
+        '''Create an asset held in full by its creator without a transaction, returns the asset-id'''
+        with self.lock:
+            assetId = self.nextAssetId
+            self.nextAssetId += 1
+            self.assets[assetId] = {"creator": creator, "total": total, "decimals": decimals}
+            self.account(creator)["assets"][assetId] = {"amount": total, "is-frozen": False}
+            return assetId
+
+    def optIn(self, address, assetId):
+        '''Opt an account in to an asset without a transaction'''
+        with self.lock:
+            self.account(address)["assets"].setdefault(assetId, {"amount": 0, "is-frozen": False})
+
+    def account(self, address):
+        return self.accounts.setdefault(address, {"amount": 0, "assets": {}})
+
+    def minBalance(self, address):
+        return MIN_BALANCE * (1 + len(self.account(address)["assets"]))
+
+    def advance(self):
+        '''Close every round whose time has passed, confirming the pool'''
+        target = self.startRound + int((time.monotonic() - self.started) / self.roundTime)
+        while self.round < target:
+            self.round += 1
+            for txid in self.pool:
+                self.txns[txid]["confirmed-round"] = self.round
+            self.blockTxids[self.round] = self.pool
+            self.pool = []
+
+    def count(self, endpoint):
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def handle(self, method, path, query=None, body=None):
+        '''Serve one request, returning (status code, response dict)'''
+        if self.latency:
+            time.sleep(self.latency)
+        if self.errorRate and self.random.random() < self.errorRate:
+            self.count("unavailable")
+            return 503, {"message": "node is temporarily unavailable"}
+        parts = path.strip("/").split("/")
+        if parts and parts[0] == "v2":
+            parts = parts[1:]
+
+        with self.lock:
+            self.advance()
+            self.bytesIn += len(body or b"")
+            if method == "GET" and parts == ["transactions", "params"]:
+                self.count("params")
+                return 200, {"fee": 0, "last-round": self.round, "genesis-hash": GENESIS_HASH, "genesis-id": GENESIS_ID,
+                             "consensus-version": "fake", "min-fee": MIN_FEE}
+            if method == "GET" and len(parts) == 2 and parts[0] == "accounts":
+                self.count("account_info")
+                return 200, self.accountInfo(parts[1])
+            if method == "POST" and parts == ["transactions"]:
+                self.count("send")
+                return self.submit(body)
+            if method == "POST" and parts == ["transactions", "simulate"]:
+                self.count("simulate")
+                return self.simulate(body)
+            if method == "GET" and len(parts) == 3 and parts[:2] == ["transactions", "pending"]:
+                self.count("pending")
+                return self.pendingInfo(parts[2])
+            if method == "GET" and parts == ["status"]:
+                self.count("status")
+                return 200, self.status()
+            if method == "GET" and parts == ["health"]:
+                self.count("health")
+                return 200, {}
+            if method == "GET" and len(parts) == 3 and parts[0] == "blocks" and parts[2] == "txids":
+                self.count("block_txids")
+                return self.blockTxidsOf(int(parts[1]))
+
+        if method == "GET" and len(parts) == 3 and parts[:2] == ["status", "wait-for-block-after"]:
+            self.count("status_after_block")
+            return 200, self.waitForBlockAfter(int(parts[2]))
+        return 404, {"message": f"{method} {path} not found"}
+
+    def status(self):
+        return {"last-round": self.round, "catchup-time": 0, "time-since-last-round": 0}
+
+    def waitForBlockAfter(self, roundNum):
+        deadline = time.monotonic() + 5.0
+        while True:
+            with self.lock:
+                self.advance()
+                if self.round > roundNum or time.monotonic() > deadline:
+                    return self.status()
+            time.sleep(self.roundTime / 4)
+
+    def accountInfo(self, address):
+        acct = self.account(address)
+        return {"address": address, "amount": acct["amount"], "min-balance": self.minBalance(address),
+                "round": self.round,
+                "assets": [{"asset-id": assetId, "amount": holding["amount"], "is-frozen": holding["is-frozen"]}
+                           for assetId, holding in acct["assets"].items()]}
+
+    def pendingInfo(self, txid):
+        info = self.txns.get(txid)
+        if info is None:
+            return 404, {"message": "txn does not exist"}
+        if info["confirmed-round"]:
+            self.observe(txid)
+        return 200, dict(info)
+
+    def observe(self, txid):
+        first = self.groupOf[txid]
+        if first not in self.observed:
+            self.observed[first] = time.monotonic() - self.submittedAt[first]
+
+    def blockTxidsOf(self, roundNum):
+        if roundNum > self.round:
+            return 404, {"message": f"failed to retrieve information from the ledger: round {roundNum} not available"}
+        txids = self.blockTxids.get(roundNum, [])
+        for txid in txids:
+            self.observe(txid)
+        return 200, {"blockTxids": list(txids)}
+
+    def submit(self, body):
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body or b"")
+        try:
+            group = [encoding.msgpack_decode(stxn) for stxn in unpacker]
+        except Exception as e:
+            return 400, {"message": f"could not decode transactions: {e}"}
+        if not group:
+            return 400, {"message": "empty transaction group"}
+
+        problem = self.check(group)
+        if problem:
+            return 400, {"message": f"TransactionPool.Remember: {problem}"}
+
+        first = group[0].get_txid()
+        self.submittedAt[first] = time.monotonic()
+        for stxn in group:
+            txid = stxn.get_txid()
+            info = {"confirmed-round": 0, "pool-error": "", "txn": {"txn": {"type": stxn.transaction.type}}}
+            assetId = self.apply(stxn.transaction)
+            if assetId:
+                info["asset-index"] = assetId
+            self.txns[txid] = info
+            self.groupOf[txid] = first
+            self.pool.append(txid)
+        return 200, {"txId": first}
+
+    def simulate(self, body):
+        '''Check each group of a simulate request without applying it, signatures may be left out'''
+        try:
+            request = msgpack.unpackb(body or b"", raw=False)
+            groups = [[transaction.SignedTransaction(transaction.Transaction.undictify(stxn["txn"]), stxn.get("sig"))
+                       for stxn in group.get("txns", [])] for group in request.get("txn-groups", [])]
+        except Exception as e:
+            return 400, {"message": f"could not decode simulate request: {e}"}
+
+        results = []
+        for group in groups:
+            result = {"txn-results": [{"txn-result": {"txn": {"txn": {"type": stxn.transaction.type}}}} for stxn in group]}
+            problem = self.check(group) if group else "empty transaction group"
+            if problem:
+                result["failure-message"] = problem
+            results.append(result)
+        return 200, {"version": 2, "last-round": self.round, "txn-groups": results}
+
+    def check(self, group):
+        '''Reason the node would reject the group, or None'''
+        if len(group) > 16:
+            return "group has more than 16 transactions"
+        if sum(stxn.transaction.fee for stxn in group) < MIN_FEE * len(group):
+            return "fee too small for the group"
+
+        algos = {}
+        extraMinBalance = {}  # min-balance added by opt-ins and new assets
+        units = {}
+        optedIn = set()  # (address, assetId) opted in earlier in the same group
+        for stxn in group:
+            txn = stxn.transaction
+            if stxn.get_txid() in self.txns:
+                return f"transaction already in ledger: {stxn.get_txid()}"
+            if not txn.first_valid_round <= self.round + 1 <= txn.last_valid_round:
+                return f"txn dead: round {self.round} outside of {txn.first_valid_round}--{txn.last_valid_round}"
+            algos[txn.sender] = algos.get(txn.sender, 0) - txn.fee
+            if txn.type == "pay":
+                algos[txn.sender] -= txn.amt
+                algos[txn.receiver] = algos.get(txn.receiver, 0) + txn.amt
+            elif txn.type == "axfer":
+                if txn.index not in self.assets:
+                    return f"asset {txn.index} does not exist"
+                holds = lambda address: txn.index in self.account(address)["assets"] or (address, txn.index) in optedIn
+                if txn.sender == txn.receiver and txn.amount == 0 and not holds(txn.sender):
+                    optedIn.add((txn.sender, txn.index))
+                    extraMinBalance[txn.sender] = extraMinBalance.get(txn.sender, 0) + MIN_BALANCE
+                    continue
+                if not holds(txn.sender):
+                    return f"sender {txn.sender} not opted in to asset {txn.index}"
+                if not holds(txn.receiver):
+                    return f"receiver {txn.receiver} not opted in to asset {txn.index}"
+                units[(txn.sender, txn.index)] = units.get((txn.sender, txn.index), 0) - txn.amount
+                units[(txn.receiver, txn.index)] = units.get((txn.receiver, txn.index), 0) + txn.amount
+            elif txn.type == "acfg" and not txn.index:
+                extraMinBalance[txn.sender] = extraMinBalance.get(txn.sender, 0) + MIN_BALANCE  # the creator holds it
+
+        for address, change in algos.items():
+            acct = self.account(address)
+            balance = acct["amount"] + change
+            needed = self.minBalance(address) + extraMinBalance.get(address, 0)
+            if balance == 0 and not acct["assets"] and address not in extraMinBalance:
+                continue  # an empty account is allowed, the ledger drops it
+            if balance < needed:
+                return f"account {address} balance {balance} below min {needed}"
+        for (address, assetId), change in units.items():
+            holding = self.account(address)["assets"].get(assetId)
+            if change < 0 and (holding["amount"] if holding else 0) + change < 0:
+                return f"underflow on asset {assetId} for {address}"
+        return None
+
+    def apply(self, txn):
+        sender = self.account(txn.sender)
+        sender["amount"] -= txn.fee
+        if txn.type == "pay":
+            sender["amount"] -= txn.amt
+            self.account(txn.receiver)["amount"] += txn.amt
+        elif txn.type == "axfer":
+            receiver = self.account(txn.receiver)
+            if txn.index not in receiver["assets"]:
+                receiver["assets"][txn.index] = {"amount": 0, "is-frozen": False}
+            sender["assets"][txn.index]["amount"] -= txn.amount
+            receiver["assets"][txn.index]["amount"] += txn.amount
+        elif txn.type == "acfg" and not txn.index:
+            assetId = self.nextAssetId
+            self.nextAssetId += 1
+            self.assets[assetId] = {"creator": txn.sender, "total": txn.total, "decimals": txn.decimals,
+                                    "unit-name": txn.unit_name, "name": txn.asset_name}
+            sender["assets"][assetId] = {"amount": txn.total, "is-frozen": False}
+            return assetId
+        return None
+
+    def confirmationLatencies(self):
+        '''Client-observed confirmation latency in seconds for every group seen confirmed'''
+        with self.lock:
+            return list(self.observed.values())
+
+    def resetCounters(self):
+        with self.lock:
+            self.calls = {}
+            self.bytesIn = 0
+            self.observed = {}
+
+
+class FakeAlgodClient(algod.AlgodClient):
+    '''AlgodClient whose requests are answered by a FakeAlgod instead of going over HTTP'''
+
+    '''Only algod_request is replaced, so request building and response parsing are still done by the SDK. Several
+    clients on one FakeAlgod act as several nodes of the same network: each adds its own `latency`, and one whose
+    `down` is set refuses every connection.'''
+
+    def __init__(self, fake, algod_address="http://fake-algod", latency=0.0):
+        super().__init__("", algod_address)
+        self.fake = fake
+        self.latency = latency
+        self.down = False
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        if self.down:
+            raise ConnectionRefusedError(f"{self.algod_address} is down")
+        if self.latency:
+            time.sleep(self.latency)
+        status, result = self.fake.handle(method, requrl, params, data)
+        if status >= 400:
+            raise error.AlgodHTTPError(result.get("message"), status, result.get("data"))
+        return result
+
+
+def serveFakeAlgod(fake, host="127.0.0.1", port=0):
+    '''Serve a FakeAlgod over HTTP/1.1 with keep-alive on a background thread, returns the server'''
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # the headers and the body go out as two writes
+
+        def log_message(self, *args):
+            pass
+
+        def respond(self, method):
+            url = urlparse(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, result = fake.handle(method, url.path, parse_qs(url.query), body)
+            data = json.dumps(result).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self.respond("GET")
+
+        def do_POST(self):
+            self.respond("POST")
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.address = f"http://{host}:{server.server_port}"
+    return server
@@ -0,0 +1,44 @@
+class HoldingsIndex:
+    '''O(1) asset-id lookup over the holdings of one account'''
+
+    '''Built once from the "assets" list of an account_info response, which for a custodial account can hold thousands
+    of assets. Only (amount, frozen) is kept per asset-id, not the response dicts. lookup() returns None when the
+    account is not opted in to the asset, which is not the same as a holding of 0 units.'''
+
+    __slots__ = ("entries",)
+
+    def __init__(self, assets=()):
+        self.entries = {asset["asset-id"]: (asset["amount"], asset.get("is-frozen", False)) for asset in assets}
+
+    @classmethod
+    def fromAccountInfo(cls, info):
+        return cls(info.get("assets", []))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, assetId):
+        return assetId in self.entries
+
+    def lookup(self, assetId):
+        '''(amount, frozen), or None when the account is not opted in'''
+        return self.entries.get(assetId)
+
+    def amount(self, assetId):
+        '''Units held, or None when the account is not opted in'''
+        entry = self.entries.get(assetId)
+        return entry[0] if entry is not None else None
+
+    def isFrozen(self, assetId):
+        '''Whether the holding is frozen, or None when the account is not opted in'''
+        entry = self.entries.get(assetId)
+        return entry[1] if entry is not None else None
+
+    def lookupMany(self, assetIds):
+        '''{assetId: (amount, frozen) or None} for many assets of this account'''
+        entries = self.entries
+        return {assetId: entries.get(assetId) for assetId in assetIds}
+
+    def assetIds(self):
+        return self.entries.keys()
+
@@ -0,0 +1,234 @@
+import json
+import random
+import re
+import threading
+import time
+
+from algosdk import transaction
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENDPOINTS = [
+    ("GET", re.compile(r"^/accounts/[^/]+$"), "account_info"),
+    ("GET", re.compile(r"^/accounts/[^/]+/assets/\d+$"), "account_asset_info"),
+    ("GET", re.compile(r"^/transactions/params$"), "suggested_params"),
+    ("POST", re.compile(r"^/transactions$"), "send_transaction"),
+    ("POST", re.compile(r"^/transactions/simulate$"), "simulate"),
+    ("GET", re.compile(r"^/transactions/pending/[^/]+$"), "pending_transaction_info"),
+    ("GET", re.compile(r"^/status$"), "status"),
+    ("GET", re.compile(r"^/status/wait-for-block-after/\d+$"), "status_after_block"),
+    ("GET", re.compile(r"^/blocks/\d+/txids$"), "block_txids"),
+    ("GET", re.compile(r"^/blocks/\d+$"), "block_info"),
+]
+IDENTIFIERS = re.compile(r"/[A-Z2-7]{52}(?:[A-Z2-7]{6})?(?=/|$)|/\d+(?=/|$)")  # addresses, txids and rounds
+
+
+def endpointName(method, requrl):
+    '''Stable label for a request, with addresses, txids and rounds taken out of the path'''
+    path = requrl.split("?")[0]
+    if path.startswith("/v2/"):
+        path = path[3:]
+    for endpointMethod, pattern, name in ENDPOINTS:
+        if method == endpointMethod and pattern.match(path):
+            return name
+    path = IDENTIFIERS.sub("/{id}", path)
+    return f"{method} {path}"
+
+
+class MemorySink:
+    '''Aggregates the events per endpoint in memory and summarises them'''
+
+    '''Counts, errors, retries, seconds and bytes are running totals, and the percentiles come from a reservoir of at
+    most `reservoirSize` latencies per endpoint sampled uniformly from all of them, so a long run holds as much as a
+    short one. The percentiles are exact until an endpoint has had more calls than that.'''
+
+    def __init__(self, reservoirSize=1024, seed=None):
+        self.reservoirSize = max(1, reservoirSize)
+        self.random = random.Random(seed)
+        self.series = {}  # endpoint -> aggregates and latency sample
+        self.lock = threading.Lock()
+
+    def emit(self, event):
+        with self.lock:
+            series = self.series.setdefault(event["endpoint"], {
+                "count": 0, "errors": 0, "retries": 0, "totalSeconds": 0.0, "bytesSent": 0, "bytesReceived": 0,
+                "sample": []})
+            series["count"] += 1
+            series["errors"] += 0 if event["ok"] else 1
+            series["retries"] += event["retries"]
+            series["totalSeconds"] += event["seconds"]
+            series["bytesSent"] += event["bytesSent"]
+            series["bytesReceived"] += event["bytesReceived"]
+            sample = series["sample"]
+            if len(sample) < self.reservoirSize:
+                sample.append(event["seconds"])
+            else:
+                slot = self.random.randrange(series["count"])  # keeps every latency seen with the same chance
+                if slot < self.reservoirSize:
+                    sample[slot] = event["seconds"]
+
+    def summary(self):
+        '''{endpoint: count, errors, retries, total/mean/p50/p99 seconds and bytes}'''
+        summary = {}
+        with self.lock:
+            for endpoint, series in sorted(self.series.items()):
+                seconds = sorted(series["sample"])
+                summary[endpoint] = {
+                    "count": series["count"],
+                    "errors": series["errors"],
+                    "retries": series["retries"],
+                    "totalSeconds": series["totalSeconds"],
+                    "meanSeconds": series["totalSeconds"] / series["count"],
+                    "p50Seconds": seconds[(len(seconds) - 1) // 2],
+                    "p99Seconds": seconds[max(0, int(len(seconds) * 0.99 + 0.5) - 1)],
+                    "bytesSent": series["bytesSent"],
+                    "bytesReceived": series["bytesReceived"],
+                }
+        return summary
+
+
+class JsonLinesSink:
+    '''Appends one JSON object per event to a file'''
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", buffering=1)
+
+    def emit(self, event):
+        line = json.dumps(event)
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class PrometheusSink:
+    '''Aggregates events into counters and latency histograms rendered in the Prometheus text format'''
+
+    def __init__(self, prefix="algod_client", buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}  # endpoint -> aggregates
+
+    def emit(self, event):
+        with self.lock:
+            series = self.series.setdefault(event["endpoint"], {
+                "count": 0, "errors": 0, "retries": 0, "sum": 0.0, "bytesSent": 0, "bytesReceived": 0,
+                "buckets": [0] * len(self.buckets)})
+            series["count"] += 1
+            series["errors"] += 0 if event["ok"] else 1
+            series["retries"] += event["retries"]
+            series["sum"] += event["seconds"]
+            series["bytesSent"] += event["bytesSent"]
+            series["bytesReceived"] += event["bytesReceived"]
+            for i, bound in enumerate(self.buckets):
+                if event["seconds"] <= bound:
+                    series["buckets"][i] += 1
+
+    def render(self):
+        '''Text exposition of every metric'''
+        p = self.prefix
+        lines = [f"# TYPE {p}_request_seconds histogram"]
+        counters = {"requests_total": "count", "errors_total": "errors", "retries_total": "retries",
+                    "sent_bytes_total": "bytesSent", "received_bytes_total": "bytesReceived"}
+        with self.lock:
+            for endpoint, series in sorted(self.series.items()):
+                label = f'endpoint="{endpoint}"'
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(f'{p}_request_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'{p}_request_seconds_bucket{{{label},le="+Inf"}} {series["count"]}')
+                lines.append(f"{p}_request_seconds_sum{{{label}}} {series['sum']:.6f}")
+                lines.append(f"{p}_request_seconds_count{{{label}}} {series['count']}")
+            for name, field in counters.items():
+                lines.append(f"# TYPE {p}_{name} counter")
+                for endpoint, series in sorted(self.series.items()):
+                    lines.append(f'{p}_{name}{{endpoint="{endpoint}"}} {series[field]}')
+        return "\n".join(lines) + "\n"
+
+
+class Instrumentation:
+    '''Times every algod request and signing call and hands the events to the sinks'''
+
+    '''instrumentClient() wraps algod_request on one client instance, so every SDK method of that client (and of the
+    FakeAlgodClient or any other subclass) is timed without changing the workflow functions. instrumentSigning()
+    wraps Transaction.sign for the whole process; call restoreSigning() to undo it. Transports that retry can report
+    the retries of a request through record(). The bytes received are those of a raw response, or the size of the
+    body the client's transport read; a parsed response is not serialized again to measure it.'''
+
+    def __init__(self, *sinks):
+        self.sinks = list(sinks) or [MemorySink()]
+        self.originalSign = None
+
+    def record(self, endpoint, seconds, ok=True, bytesSent=0, bytesReceived=0, retries=0, error=None):
+        event = {"ts": time.time(), "endpoint": endpoint, "seconds": seconds, "ok": ok,
+                 "bytesSent": bytesSent, "bytesReceived": bytesReceived, "retries": retries}
+        if error is not None:
+            event["error"] = type(error).__name__
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def instrumentClient(self, algodClient):
+        '''Time every request made through this client, returns the client'''
+        request = algodClient.algod_request
+        transport = getattr(algodClient, "transport", None)
+        responseSize = getattr(transport, "lastResponseSize", None)
+
+        def timedRequest(method, requrl, params=None, data=None, *args, **kwargs):
+            endpoint = endpointName(method, requrl)
+            start = time.perf_counter()
+            try:
+                result = request(method, requrl, params, data, *args, **kwargs)
+            except Exception as e:
+                self.record(endpoint, time.perf_counter() - start, False, len(data or b""), error=e)
+                raise
+            seconds = time.perf_counter() - start
+            if isinstance(result, bytes):
+                received = len(result)
+            else:
+                received = responseSize() if responseSize is not None else 0
+            self.record(endpoint, seconds, True, len(data or b""), received)
+            return result
+
+        algodClient.algod_request = timedRequest
+        return algodClient
+
+    def instrumentSigning(self):
+        '''Time every Transaction.sign call in the process'''
+        if self.originalSign is not None:
+            return
+        self.originalSign = sign = transaction.Transaction.sign
+        instrumentation = self
+
+        def timedSign(txn, private_key):
+            start = time.perf_counter()
+            try:
+                return sign(txn, private_key)
+            finally:
+                instrumentation.record("sign", time.perf_counter() - start)
+
+        transaction.Transaction.sign = timedSign
+
+    def restoreSigning(self):
+        if self.originalSign is not None:
+            transaction.Transaction.sign = self.originalSign
+            self.originalSign = None
+
+    def summary(self):
+        '''Per endpoint summary from the first MemorySink'''
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink.summary()
+        return {}
+
+
+def printSummary(summary):
+    '''Print where the time went, slowest endpoint first'''
+    print("\nTime spent per call:")
+    for endpoint, stats in sorted(summary.items(), key=lambda item: -item[1]["totalSeconds"]):
+        print(f"  {endpoint:26} {stats['count']:6} calls {stats['totalSeconds']:9.3f}s total "
+              f"p50 {stats['p50Seconds'] * 1000:8.2f}ms p99 {stats['p99Seconds'] * 1000:8.2f}ms "
+              f"{stats['errors']} errors")
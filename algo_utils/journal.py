@@ -0,0 +1,180 @@
+import base64
+import mmap
+import os
+import struct
+import threading
+
+from algosdk import encoding, error
+
+RECORD = struct.Struct("<BI32sQQ")  # kind, entry number, address or txid, two values: 53 bytes
+HEADER, PLANNED, SENT, CONFIRMED, FAILED = range(5)
+STATES = {PLANNED: "planned", SENT: "sent", CONFIRMED: "confirmed", FAILED: "failed"}
+
+
+def txidBytes(txid):
+    return base64.b32decode(txid + "=" * (-len(txid) % 8))
+
+
+def txidString(raw):
+    return base64.b32encode(raw).decode().rstrip("=")
+
+
+class DistributionJournal:
+    '''Append-only write-ahead journal of a distribution run'''
+
+    '''Every record is 53 bytes: the header (sender and asset), one PLANNED record per transfer with the receiver and
+    the amount, a SENT record with the txid and the first/last valid rounds written and synced before the transaction
+    is sent, and a CONFIRMED record with the round, or FAILED when the transaction was rejected or can no longer be
+    confirmed. Nothing is ever rewritten; the state of an entry is its last record. Opening a journal replays it from
+    a memory map, and a record cut short by a crash is dropped.
+
+    On restart reconcile() only looks at the entries that were sent but not confirmed: what the node still has in its
+    pool is answered by pending_transaction_info, and the rest is looked for in the txids of the blocks of their
+    validity windows, so an entry is retried only once its last valid round has passed without it. Entries that were
+    confirmed cost nothing, and recovery takes as long as what was left to do.'''
+
+    def __init__(self, path, sender, assetId, fee=1000):
+        self.path = path
+        self.lock = threading.Lock()
+        self.receivers = []  # 32-byte public keys
+        self.amounts = []
+        self.states = bytearray()
+        self.txids = {}  # entry -> txid of its latest send
+        self.validity = {}  # entry -> (first valid, last valid)
+        self.rounds = {}  # entry -> confirmed round
+        senderKey = encoding.decode_address(sender)
+
+        if os.path.exists(path) and os.path.getsize(path) >= RECORD.size:
+            self.replay()
+            if (self.sender, self.assetId) != (senderKey, assetId):
+                raise ValueError(f"{path} is the journal of another distribution")
+            self.fee = self.headerFee
+            self.file = open(path, "ab")
+        else:
+            self.sender, self.assetId, self.fee = senderKey, assetId, fee
+            self.file = open(path, "wb")
+            self.file.write(RECORD.pack(HEADER, 0, senderKey, assetId, fee))
+            self.sync()
+
+    def replay(self):
+        with open(self.path, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            complete = size - size % RECORD.size
+            if complete != size:
+                f.truncate(complete)  # a record cut short by a crash
+            with mmap.mmap(f.fileno(), complete, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for kind, entry, key, first, second in RECORD.iter_unpack(view):
+                        self.apply(kind, entry, key, first, second)
+                finally:
+                    view.release()
+
+    def apply(self, kind, entry, key, first, second):
+        if kind == HEADER:
+            self.sender, self.assetId, self.headerFee = key, first, second
+        elif kind == PLANNED:
+            self.receivers.append(key)
+            self.amounts.append(first)
+            self.states.append(PLANNED)
+        elif kind == SENT:
+            self.states[entry] = SENT
+            self.txids[entry] = txidString(key)
+            self.validity[entry] = (first, second)
+        elif kind == CONFIRMED:
+            self.states[entry] = CONFIRMED
+            self.rounds[entry] = first
+        elif kind == FAILED:
+            self.states[entry] = FAILED
+
+    def append(self, records):
+        with self.lock:
+            for record in records:
+                self.apply(*record)
+            self.file.write(b"".join(RECORD.pack(*record) for record in records))
+
+    def sync(self):
+        '''Flush the journal to disk'''
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def __len__(self):
+        return len(self.states)
+
+    def plan(self, receivers, amounts):
+        '''Add transfers to the run, receivers are addresses'''
+        start = len(self.states)
+        self.append([(PLANNED, start + n, encoding.decode_address(receiver), int(amount), 0)
+                     for n, (receiver, amount) in enumerate(zip(receivers, amounts))])
+        self.sync()
+        return len(self.states) - start
+
+    def sent(self, entries):
+        '''Record (entry, txid, first valid, last valid) before sending, synced to disk'''
+        self.append([(SENT, entry, txidBytes(txid), firstValid, lastValid)
+                     for entry, txid, firstValid, lastValid in entries])
+        self.sync()
+
+    def confirmed(self, entry, roundNum):
+        self.append([(CONFIRMED, entry, bytes(32), roundNum, 0)])
+
+    def failed(self, entry):
+        self.append([(FAILED, entry, bytes(32), 0, 0)])
+
+    def receiver(self, entry):
+        return encoding.encode_address(self.receivers[entry])
+
+    def toSend(self):
+        '''Entries never sent or whose send failed'''
+        return [entry for entry, state in enumerate(self.states) if state in (PLANNED, FAILED)]
+
+    def unconfirmed(self):
+        return [entry for entry, state in enumerate(self.states) if state == SENT]
+
+    def counts(self):
+        counts = dict.fromkeys(STATES.values(), 0)
+        for state in self.states:
+            counts[STATES[state]] += 1
+        return counts
+
+    def reconcile(self, algodClient):
+        '''Settle every entry that was sent but not recorded as confirmed, returns the number looked at'''
+        unconfirmed = self.unconfirmed()
+        byTxid = {self.txids[entry]: entry for entry in unconfirmed}
+
+        """ What the node still knows about"""
+        for txid, entry in list(byTxid.items()):
+            try:
+                txInfo = algodClient.pending_transaction_info(txid)
+            except error.AlgodHTTPError:
+                continue  # not in the pool any more, look for it in the blocks
+            if txInfo.get("confirmed-round"):
+                self.confirmed(byTxid.pop(txid), txInfo["confirmed-round"])
+            elif txInfo.get("pool-error"):
+                self.failed(byTxid.pop(txid))
+
+        """ The rest is in a block of its validity window or is not confirmed at all"""
+        rounds = set()
+        for entry in byTxid.values():
+            firstValid, lastValid = self.validity[entry]
+            rounds.update(range(firstValid, lastValid + 1))
+        lastRound = algodClient.status()["last-round"] if byTxid else 0
+        for roundNum in sorted(rounds):
+            if not byTxid:
+                break
+            while roundNum > lastRound:
+                lastRound = algodClient.status_after_block(lastRound)["last-round"]
+            for txid in algodClient.get_block_txids(roundNum).get("blockTxids") or []:
+                if txid in byTxid:
+                    self.confirmed(byTxid.pop(txid), roundNum)
+            for txid, entry in list(byTxid.items()):
+                if self.validity[entry][1] <= roundNum:
+                    self.failed(byTxid.pop(txid))  # past its last valid round, safe to send again
+
+        self.sync()
+        return len(unconfirmed)
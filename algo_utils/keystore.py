@@ -0,0 +1,170 @@
+import base64
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import nacl.pwhash
+import nacl.secret
+import nacl.signing
+import nacl.utils
+from algosdk import account
+
+from algo_utils.accounts import Account
+
+VERSION = 1
+SEED_SIZE = 32
+NONCE_SIZE = nacl.secret.SecretBox.NONCE_SIZE
+RECORD_SIZE = NONCE_SIZE + SEED_SIZE + nacl.secret.SecretBox.MACBYTES  # 72 bytes per account
+ADDRESS_LINE = 59  # 58 character address and a newline
+CHECK = b"algo_utils keystore"
+
+
+def deriveKey(password, salt, opslimit, memlimit):
+    return nacl.pwhash.argon2id.kdf(nacl.secret.SecretBox.KEY_SIZE, password.encode(), salt,
+                                    opslimit=opslimit, memlimit=memlimit)
+
+
+def generateBatch(key, count):
+    '''Worker: generate `count` accounts and return (encrypted records, address lines)'''
+    box = nacl.secret.SecretBox(key)
+    records = []
+    addresses = []
+    for _ in range(count):
+        privateKey, publicAdress = account.generate_account()
+        seed = base64.b64decode(privateKey)[:SEED_SIZE]
+        records.append(box.encrypt(seed, nacl.utils.random(NONCE_SIZE)))
+        addresses.append(publicAdress + "\n")
+    return b"".join(records), "".join(addresses).encode()
+
+
+class Keystore:
+    '''Encrypted, append-only store for large numbers of accounts'''
+
+    '''A keystore is a directory with three files:
+       header.json    the key derivation parameters (argon2id salt and limits) and a password check
+       secrets.bin    one fixed-size record per account: nonce + the 32-byte key seed sealed with XSalsa20-Poly1305
+       addresses.idx  one address per line, line n is the address of record n
+    Both data files are only ever appended to, so a batch is written with two sequential writes and a record is
+    found by seeking to n * RECORD_SIZE. The mnemonic and the 64-byte private key are not stored, they are derived
+    from the seed when an account is loaded. If a write was interrupted, the files are cut back to the last complete
+    account when the keystore is opened.'''
+
+    def __init__(self, path, password, opslimit=nacl.pwhash.argon2id.OPSLIMIT_INTERACTIVE,
+                 memlimit=nacl.pwhash.argon2id.MEMLIMIT_INTERACTIVE):
+        self.path = path
+        self.headerPath = os.path.join(path, "header.json")
+        self.secretsPath = os.path.join(path, "secrets.bin")
+        self.indexPath = os.path.join(path, "addresses.idx")
+        self.positions = None  # address -> record number, built on first lookup
+
+        if os.path.exists(self.headerPath):
+            with open(self.headerPath) as f:
+                header = json.load(f)
+            if header.get("version") != VERSION:
+                raise ValueError(f"unsupported keystore version {header.get('version')}")
+            self.key = deriveKey(password, base64.b64decode(header["salt"]), header["opslimit"], header["memlimit"])
+            try:
+                nacl.secret.SecretBox(self.key).decrypt(base64.b64decode(header["check"]))
+            except Exception:
+                raise ValueError("wrong keystore password")
+        else:
+            os.makedirs(path, exist_ok=True)
+            salt = nacl.utils.random(nacl.pwhash.argon2id.SALTBYTES)
+            self.key = deriveKey(password, salt, opslimit, memlimit)
+            check = nacl.secret.SecretBox(self.key).encrypt(CHECK)
+            with open(self.headerPath, "w") as f:
+                json.dump({"version": VERSION, "kdf": "argon2id", "salt": base64.b64encode(salt).decode(),
+                           "opslimit": opslimit, "memlimit": memlimit, "check": base64.b64encode(check).decode()}, f)
+            open(self.secretsPath, "ab").close()
+            open(self.indexPath, "ab").close()
+
+        self.count = self.repair()
+        self.box = nacl.secret.SecretBox(self.key)
+
+    def repair(self):
+        '''Cut both files back to the number of complete accounts they agree on'''
+        count = min(os.path.getsize(self.secretsPath) // RECORD_SIZE, os.path.getsize(self.indexPath) // ADDRESS_LINE)
+        for filePath, size in ((self.secretsPath, count * RECORD_SIZE), (self.indexPath, count * ADDRESS_LINE)):
+            if os.path.getsize(filePath) != size:
+                with open(filePath, "r+b") as f:
+                    f.truncate(size)
+        return count
+
+    def __len__(self):
+        return self.count
+
+    def append(self, records, addresses):
+        '''Append a batch produced by generateBatch'''
+        with open(self.secretsPath, "ab") as f:
+            f.write(records)
+        with open(self.indexPath, "ab") as f:
+            f.write(addresses)
+        added = len(addresses) // ADDRESS_LINE
+        if self.positions is not None:
+            lines = addresses.decode().split()
+            for i, address in enumerate(lines):
+                self.positions[address] = self.count + i
+        self.count += added
+        return added
+
+    def add(self, accountName):
+        '''Store one existing Account or account dict'''
+        seed = base64.b64decode(accountName["privateKey"])[:SEED_SIZE]
+        record = self.box.encrypt(seed, nacl.utils.random(NONCE_SIZE))
+        return self.append(record, (accountName["publicAdress"] + "\n").encode())
+
+    def addresses(self):
+        '''Iterate over the stored addresses without loading any secret'''
+        with open(self.indexPath, "rb") as f:
+            for n, line in enumerate(f):
+                if n >= self.count:
+                    break
+                yield line.decode().rstrip("\n")
+
+    def record(self, n):
+        '''Decrypt account number n'''
+        if not 0 <= n < self.count:
+            raise IndexError(n)
+        with open(self.secretsPath, "rb") as f:
+            f.seek(n * RECORD_SIZE)
+            seed = self.box.decrypt(f.read(RECORD_SIZE))
+        return Account(bytes(nacl.signing.SigningKey(seed).verify_key), seed)
+
+    def load(self, address):
+        '''Account record for an address, the same as accountGen returns'''
+        if self.positions is None:
+            self.positions = {address: n for n, address in enumerate(self.addresses())}
+        if address not in self.positions:
+            raise KeyError(address)
+        return self.record(self.positions[address])
+
+
+def generateAccounts(path, password, count, workers=None, batchSize=1000):
+    '''Generate `count` accounts across a process pool and stream them into the keystore at `path`'''
+
+    '''Workers generate and encrypt whole batches, the parent only appends the bytes they return, so memory stays at
+    a few batches no matter how many accounts are generated. Returns the number of accounts, the elapsed time and
+    the accounts per second.'''
+    keystore = Keystore(path, password)
+    workers = workers or os.cpu_count() or 1
+    batches = [batchSize] * (count // batchSize) + ([count % batchSize] if count % batchSize else [])
+
+    start = time.perf_counter()
+    generated = 0
+    if workers == 1:
+        for size in batches:
+            generated += keystore.append(*generateBatch(keystore.key, size))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = [pool.submit(generateBatch, keystore.key, size) for size in batches[:workers * 2]]
+            queued = len(pending)
+            while pending:
+                generated += keystore.append(*pending.pop(0).result())
+                if queued < len(batches):
+                    pending.append(pool.submit(generateBatch, keystore.key, batches[queued]))
+                    queued += 1
+    seconds = time.perf_counter() - start
+
+    return {"accounts": generated, "total": len(keystore), "workers": workers, "seconds": seconds,
+            "accountsPerSec": generated / seconds if seconds else 0.0}
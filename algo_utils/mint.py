@@ -0,0 +1,115 @@
+from math import log10
+
+from algosdk import transaction
+
+from algo_utils.params import suggestedParams, uniqueNote
+from algo_utils.preflight import preflight
+from algo_utils.snapshot import snapshots
+
+
+def ASAmint(algodClient, accountName, name, totalNumAsset):
+    '''Issue ASA called UCTZAR'''
+    try:
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+
+        txn = transaction.AssetConfigTxn(
+            sender=accountName["publicAdress"],
+            sp=param,
+            total=totalNumAsset,
+            default_frozen=False,
+            unit_name= name.upper(),
+            asset_name= name.lower(),
+            manager=accountName["publicAdress"],
+            reserve=accountName["publicAdress"],
+            freeze=accountName["publicAdress"],
+            clawback=accountName["publicAdress"],
+            decimals=0,
+            note=uniqueNote())
+
+        # check Account balance is enough for the fee and the min-balance of the new ASA before signing
+        problems = preflight(algodClient, [txn])
+        if problems:
+            print(f"Insufficient funds in the account: {'; '.join(problems)}")
+            return
+
+        stxn = txn.sign(accountName["privateKey"])
+        txid = algodClient.send_transaction(stxn)
+        print(f"Asset has been sent with txid: {txid}")
+
+        results = transaction.wait_for_confirmation(algodClient, txid, 4) # 4 rounds for verifiation
+        snapshots.invalidate(accountName["publicAdress"])
+        assetId = results["asset-index"]
+        print(f"Asset ID for {name.upper()} : {assetId}")
+        
+        return assetId
+
+    except Exception as e:
+        print(f"Error issuing ASA: {e}")
+        return None
+
+
+def FracNft(algodClient, accountName, name, totalUnitAmount):
+    '''Issue Fractional NFT'''
+
+    """To create a fractional NFT, the total units must be a power of base 10, 
+       that is greater than 1, and the number of decimals must be equal to 
+       the logarithm of base 10 of the total number of units. The fractional NFT standard 
+       is defined as part of ARC-0003. From(https://developer.algorand.org/docs/get-started/tokenization/nft/)
+       
+       
+       The FracNft function is designed to issue a fractional NFT (Non-Fungible Token) on the Algorand blockchain, 
+       adhering to the standards outlined in ARC-0003.This function takes as input the instance of the Algorand client (algod_client), 
+       the account details for the sender, in this case, account B (accountName), a name for the NFT (name), and the total number of units for the NFT (totalUnitAmount).
+       The function begins by checking if the account has sufficient funds to cover the transaction fee. If not, it prints an error message and exits. The function then 
+       calculates the number of decimals required for the fractional NFT based on the logarithm in base 10 of the total number of units following the standards for the NFT.
+       Using the Algorand Python SDK,  the function creates an asset configuration transaction (txn) with specified parameters such as the total units, unit name, asset name,
+       manager, reserve, freeze, clawback addresses, and decimals. The transaction is signed with the account's private key and sent to the Algorand network. 
+       The function waits for confirmation and prints the transaction details, including the resulting fractional NFT's asset ID.If any exception occurs during the process,
+       an error message is printed, and the function returns None. Overall, the function streamlines the issuance of fractional NFTs on the Algorand blockchain.
+    
+       """
+    try:
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+
+        total_units = totalUnitAmount
+        decimals = int(log10(total_units))
+
+        txn = transaction.AssetConfigTxn(
+            sender=accountName["publicAdress"],
+            sp=param,
+            total=total_units,
+            default_frozen=False,
+            unit_name=name.upper(),
+            asset_name=name.lower(),
+            manager=accountName["publicAdress"],
+            reserve=accountName["publicAdress"],
+            freeze=accountName["publicAdress"],
+            clawback=accountName["publicAdress"],
+            decimals=decimals,
+            note=uniqueNote())
+
+        problems = preflight(algodClient, [txn])  # fee and the min-balance of the new asset, checked before signing
+        if problems:
+            print(f"Insufficient funds in the account: {'; '.join(problems)}")
+            return
+
+        stxn = txn.sign(accountName["privateKey"])
+        txid = algodClient.send_transaction(stxn)
+        print(f"Sent fractional NFT created transaction with txid: {txid}")
+
+        results = transaction.wait_for_confirmation(algodClient, txid, 4)  # 4 rounds for verification
+        snapshots.invalidate(accountName["publicAdress"])
+        print(f"Result confirmed in round: {results['confirmed-round']}")
+        
+        assetId = results["asset-index"]
+        print(f"Fractional NFT Asset ID for {name.upper()}: {assetId}")
+        
+        return assetId
+
+    except Exception as e:
+        print(f"Error issuing fractional NFT: {e}")
+        return None
@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from algosdk import error
+from algosdk.v2client import algod
+
+from algo_utils.transport import alreadySubmitted, submittedTxid
+
+
+class Node:
+    '''Health and latency of one algod endpoint as seen by the pool'''
+
+    def __init__(self, client):
+        self.client = client
+        self.address = client.algod_address
+        self.latency = None  # moving average of successful requests in seconds
+        self.lastRound = 0
+        self.healthy = True
+        self.downUntil = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def observe(self, seconds, weight=0.2):
+        self.latency = seconds if self.latency is None else (1 - weight) * self.latency + weight * seconds
+
+    def isUp(self, now):
+        return self.healthy and now >= self.downUntil
+
+    def stats(self):
+        return {"address": self.address, "healthy": self.isUp(time.monotonic()), "lastRound": self.lastRound,
+                "latencyMs": round(self.latency * 1000, 3) if self.latency is not None else None,
+                "requests": self.requests, "failures": self.failures}
+
+
+class MultiNodeAlgodClient(algod.AlgodClient):
+    '''AlgodClient spread over several algod nodes with latency-aware reads and failover'''
+
+    '''Takes one client per node (AlgodClient, PooledAlgodClient, FakeAlgodClient...) and replaces algod_request only,
+    so it can be passed to every existing function. Reads go to a node picked at random with a weight of one over its
+    measured latency, so faster nodes take more of the traffic without the slower ones going cold. Submissions go to
+    the healthiest node, the one furthest ahead and then the fastest, and the pending info of a transaction is asked
+    of the node it was sent to first. The txids of a block are read from a node that has reached that round, and a
+    node answering 404 for a round it has not reached yet hands the read on to the next one. A connection error, a timeout, a 429 or a 5xx fails over to the next node and
+    takes the failing node out for `cooldown` seconds; any other HTTP error is the node's answer and is raised, except
+    a submission answered "already in ledger" or "already in pool" after a failover: a node that failed had taken it,
+    so the locally computed txid is returned.
+    Every `healthInterval` seconds the status of every node is fetched on a background thread, which the request
+    that finds the check due starts without waiting for it: a node that does not answer, or is more than
+    `lagRounds` behind the best last round, only gets traffic when no other node is left.'''
+
+    def __init__(self, clients, healthInterval=5.0, lagRounds=2, cooldown=5.0, healthTimeout=2):
+        if not clients:
+            raise ValueError("at least one algod client is needed")
+        self.nodes = [Node(client) for client in clients]
+        super().__init__(clients[0].algod_token, "multi:" + ",".join(node.address for node in self.nodes))
+        self.healthInterval = healthInterval
+        self.lagRounds = lagRounds
+        self.cooldown = cooldown
+        self.healthTimeout = healthTimeout
+        self.lastCheck = 0.0
+        self.checking = threading.Lock()
+        self.lock = threading.Lock()
+        self.sentTo = {}  # txid -> node it was submitted to
+        self.failovers = 0
+
+    def checkHealth(self):
+        '''Fetch the status of every node and mark the ones down or lagging'''
+        def probe(node):
+            start = time.perf_counter()
+            try:
+                status = node.client.algod_request("GET", "/status", timeout=self.healthTimeout)
+            except Exception:
+                return node, None, None
+            return node, status.get("last-round", 0), time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=len(self.nodes)) as pool:
+            results = list(pool.map(probe, self.nodes))
+        best = max((lastRound for node, lastRound, seconds in results if lastRound is not None), default=0)
+        with self.lock:
+            for node, lastRound, seconds in results:
+                if lastRound is None:
+                    node.healthy = False
+                    continue
+                node.lastRound = max(node.lastRound, lastRound)
+                node.observe(seconds)
+                node.healthy = lastRound >= best - self.lagRounds
+            self.lastCheck = time.monotonic()
+
+    def maybeCheckHealth(self):
+        '''Start a health check in the background when one is due, never blocking the request that calls it'''
+        if time.monotonic() - self.lastCheck >= self.healthInterval and self.checking.acquire(blocking=False):
+            def run():
+                try:
+                    self.checkHealth()
+                finally:
+                    self.checking.release()
+
+            threading.Thread(target=run, daemon=True).start()
+
+    def readOrder(self):
+        '''Nodes to try for a read: one picked by latency weight first, then the others fastest first'''
+        now = time.monotonic()
+        up = [node for node in self.nodes if node.isUp(now)]
+        down = [node for node in self.nodes if not node.isUp(now)]
+        if not up:
+            return down
+        fastest = min((node.latency for node in up if node.latency), default=0.001)
+        weights = [1.0 / (node.latency or fastest) for node in up]
+        first = random.choices(up, weights)[0]
+        rest = sorted((node for node in up if node is not first), key=lambda node: node.latency or fastest)
+        return [first] + rest + down
+
+    def submitOrder(self):
+        '''Nodes to try for a submission: the furthest ahead first, then the fastest'''
+        now = time.monotonic()
+        return sorted(self.nodes, key=lambda node: (not node.isUp(now), -node.lastRound, node.latency or 0))
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        self.maybeCheckHealth()
+        submit = method == "POST" and requrl == "/transactions"
+        order = self.submitOrder() if submit else self.readOrder()
+        if requrl.startswith("/transactions/pending/"):
+            sentTo = self.sentTo.get(requrl.rsplit("/", 1)[1])
+            if sentTo is not None:
+                order = [sentTo] + [node for node in order if node is not sentTo]
+        blockRound = int(requrl.split("/")[2]) if requrl.startswith("/blocks/") else None
+        if blockRound is not None:
+            order = ([node for node in order if node.lastRound >= blockRound] +
+                     [node for node in order if node.lastRound < blockRound])
+
+        lastError = None
+        for position, node in enumerate(order):
+            start = time.perf_counter()
+            node.requests += 1
+            try:
+                result = node.client.algod_request(method, requrl, params, data, headers, response_format, timeout)
+            except error.AlgodHTTPError as e:
+                if e.code == 404 and blockRound is not None:
+                    node.observe(time.perf_counter() - start)
+                    lastError = e
+                    continue  # behind by a round or two, not down
+                if e.code is not None and e.code < 500 and e.code != 429:
+                    if submit and lastError is not None and alreadySubmitted(e):
+                        return self.answered(node, start, submit, {"txId": submittedTxid(data)})
+                    node.observe(time.perf_counter() - start)
+                    raise  # the node answered, another node would answer the same
+                lastError = e
+            except Exception as e:
+                lastError = e
+            else:
+                return self.answered(node, start, submit, result)
+
+            node.failures += 1
+            node.downUntil = time.monotonic() + self.cooldown
+            if position + 1 < len(order):
+                self.failovers += 1
+        raise lastError
+
+    def answered(self, node, start, submit, result):
+        node.observe(time.perf_counter() - start)
+        if isinstance(result, dict) and "last-round" in result:
+            node.lastRound = max(node.lastRound, result["last-round"])  # every status answer is a free health check
+        if submit and isinstance(result, dict) and "txId" in result:
+            with self.lock:
+                self.sentTo[result["txId"]] = node
+                if len(self.sentTo) > 100000:
+                    self.sentTo.pop(next(iter(self.sentTo)))
+        return result
+
+    def poolStats(self):
+        return {"failovers": self.failovers, "nodes": [node.stats() for node in self.nodes]}
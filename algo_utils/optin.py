@@ -0,0 +1,38 @@
+from algosdk import transaction
+
+from algo_utils.params import suggestedParams, uniqueNote
+from algo_utils.preflight import preflight
+from algo_utils.snapshot import snapshots
+
+
+def optIn(algodClient, accountName, assetId, engine=None):
+    '''Opt in to an asset. When a shared SubmissionEngine is given the transaction is only submitted and its Future is returned'''
+    try:
+        param = suggestedParams(algodClient)
+        param.fee = 1000
+        param.flat_fee = True
+
+        optinTxn = transaction.AssetOptInTxn(sender=accountName["publicAdress"], sp=param, index=assetId,
+                                             note=uniqueNote())
+        problems = preflight(algodClient, [optinTxn])  # the opt in raises the min-balance by 0.1 Algo
+        if problems:
+            print(f"Opt in would be rejected: {'; '.join(problems)}")
+            return None
+        signedOptinTxn = optinTxn.sign(accountName["privateKey"])
+
+        if engine is not None:
+            future = engine.submit(signedOptinTxn)  # confirmed later together with the other transactions in flight
+            future.add_done_callback(lambda f: snapshots.invalidate(accountName["publicAdress"]))
+            print(f"Sent opt in transaction with txid: {getattr(future, 'txid', None)}")
+            return future
+
+        txId = algodClient.send_transaction(signedOptinTxn)
+        print(f"Sent opt in transaction with txid: {txId}")
+
+        results = transaction.wait_for_confirmation(algodClient, txId, 4)
+        snapshots.invalidate(accountName["publicAdress"])
+        print(f"Result confirmed in round: {results['confirmed-round']}")
+        return results
+        
+    except Exception as e:
+        print(f"Error issuing ASA: {e}")
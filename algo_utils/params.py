@@ -0,0 +1,97 @@
+import copy
+import os
+import threading
+import time
+
+
+class ParamsCache:
+    '''Round-aware cache for suggested transaction parameters'''
+
+    '''suggested_params only changes with the validity window (first/last round) and the genesis of the network, so one
+    fetch can be shared by every transaction builder. Entries are keyed on the node address of the client. The current
+    round is estimated from the time since the fetch; once fewer than `refreshRounds` rounds of the window are left the
+    cached params are still served but a new copy is fetched in a background thread, and once fewer than `expireRounds`
+    are left the cache is bypassed and the params are fetched before returning. Callers always get their own copy, so
+    setting param.fee does not leak into other transactions.
+
+    Two identical transactions built from the same params would have the same txid and the second one would be
+    rejected as already in the ledger, which could not happen while every builder fetched its own params a few rounds
+    apart. The builders therefore put a uniqueNote() on every transaction that could otherwise repeat.'''
+
+    def __init__(self, roundTime=3.3, refreshRounds=200, expireRounds=10):
+        self.roundTime = roundTime  # seconds per round used to estimate the current round
+        self.refreshRounds = refreshRounds
+        self.expireRounds = expireRounds
+        self.entries = {}  # client key -> (params, time fetched)
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def key(self, algodClient):
+        return getattr(algodClient, "algod_address", None) or id(algodClient)
+
+    def roundsLeft(self, param, fetched):
+        estimatedRound = param.first + int((time.monotonic() - fetched) / self.roundTime)
+        return param.last - estimatedRound
+
+    def fetch(self, algodClient, key):
+        param = algodClient.suggested_params()
+        with self.lock:
+            self.entries[key] = (param, time.monotonic())
+        return param
+
+    def backgroundRefresh(self, algodClient, key):
+        try:
+            self.fetch(algodClient, key)
+            with self.lock:
+                self.refreshes += 1
+        except Exception as e:
+            print(f"Error refreshing suggested params: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get(self, algodClient):
+        '''Return a copy of the suggested params for this client, fetching them only when needed'''
+        key = self.key(algodClient)
+        with self.lock:
+            entry = self.entries.get(key)
+            left = self.roundsLeft(*entry) if entry else None
+            if entry is None or left <= self.expireRounds:
+                self.misses += 1
+                entry = None
+            else:
+                self.hits += 1
+                if left <= self.refreshRounds and key not in self.refreshing:
+                    self.refreshing.add(key)
+                    threading.Thread(target=self.backgroundRefresh, args=(algodClient, key), daemon=True).start()
+
+        return copy.copy(entry[0] if entry else self.fetch(algodClient, key))
+
+    def invalidate(self, algodClient=None):
+        '''Drop the cached params for one client, or for every client'''
+        with self.lock:
+            if algodClient is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(self.key(algodClient), None)
+
+    def stats(self):
+        '''Hit, miss and background refresh counters'''
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "refreshes": self.refreshes, "entries": len(self.entries)}
+
+
+paramsCache = ParamsCache()  # shared by all transaction builders
+
+
+def suggestedParams(algodClient):
+    '''Drop-in replacement for algodClient.suggested_params() served from the shared cache'''
+    return paramsCache.get(algodClient)
+
+
+def uniqueNote():
+    '''Random 8-byte note that keeps a transaction built from shared params from repeating an earlier txid'''
+    return os.urandom(8)
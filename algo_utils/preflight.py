@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from algosdk import constants, transaction
+from algosdk.v2client import models
+
+from algo_utils.snapshot import getSnapshot
+
+ASSET_MIN_BALANCE = 100000  # every asset held or created raises the min-balance by 0.1 Algo
+
+
+class Preflight:
+    '''Checks planned transactions against account snapshots before anything is signed'''
+
+    '''Groups are checked in the order they will be sent, and the changes of every group that passes are carried
+    over to the next one, so a batch of transfers from one sender is checked against what is left after the earlier
+    transfers. A group is rejected, with the reason the node would give, when it has more than 16 transactions, when
+    its fees are below the minimum fee for every transaction (fee pooling is allowed), when an asset sender or
+    receiver is not opted in or frozen, when a sender does not hold the units it sends, or when any account the group
+    touches, a new receiver as much as a sender, would end up below its min-balance once the fees, payments and new
+    opt-ins and assets are counted. Every account is read
+    from the shared snapshots, so a batch costs at most one account_info per account and no round-trip to the node.
+
+    checkBatch() fetches the accounts of the next groups concurrently, `prefetchSize` accounts at a time so they stay
+    within the snapshot cache, before checking those groups in order, and a group whose accounts can not be fetched is rejected on its own instead of failing the batch. forget() drops what was carried
+    over for accounts no later group will touch, which keeps a long batch from growing with every receiver.
+
+    With simulate=True a group that passes the local checks is also run through the node's simulate endpoint
+    unsigned, which catches what the snapshots cannot see, at the cost of one request per group.'''
+
+    def __init__(self, algodClient, simulate=False, minFee=constants.MIN_TXN_FEE):
+        self.algodClient = algodClient
+        self.simulate = simulate
+        self.minFee = minFee
+        self.algos = {}  # address -> change in microAlgos from the groups accepted so far
+        self.extraMinBalance = {}  # address -> min-balance added by opt-ins and new assets
+        self.units = {}  # (address, assetId) -> change in units
+        self.optedIn = set()  # (address, assetId) opted in by an accepted group
+
+    def holding(self, address, assetId):
+        '''(opted in, frozen, units held) as they will be once the accepted groups are applied'''
+        if (address, assetId) in self.optedIn:
+            return True, False, self.units.get((address, assetId), 0)
+        holding = getSnapshot(self.algodClient, address).holding(assetId)
+        if holding is None:
+            return False, False, 0
+        amount, frozen = holding
+        return True, frozen, amount + self.units.get((address, assetId), 0)
+
+    def check(self, txns):
+        '''Reasons the node would reject the group, empty when it would be accepted'''
+        problems = []
+        if not txns:
+            return ["empty transaction group"]
+        if len(txns) > constants.TX_GROUP_LIMIT:
+            return [f"group has {len(txns)} transactions, more than {constants.TX_GROUP_LIMIT}"]
+        fees = sum(txn.fee for txn in txns)
+        if fees < self.minFee * len(txns):
+            problems.append(f"fees of {fees} are below the minimum of {self.minFee * len(txns)} for the group")
+
+        algos = {}
+        extraMinBalance = {}
+        units = {}
+        optedIn = set()
+
+        def holds(address, assetId):
+            if (address, assetId) in optedIn:
+                return True, False
+            opted, frozen, amount = self.holding(address, assetId)
+            return opted, frozen
+
+        for n, txn in enumerate(txns):
+            sender = txn.sender
+            algos[sender] = algos.get(sender, 0) - txn.fee
+            if txn.type == constants.payment_txn:
+                algos[sender] -= txn.amt
+                algos[txn.receiver] = algos.get(txn.receiver, 0) + txn.amt
+            elif txn.type == constants.assettransfer_txn:
+                assetId = txn.index
+                if txn.receiver == sender and txn.amount == 0 and not holds(sender, assetId)[0]:
+                    optedIn.add((sender, assetId))
+                    extraMinBalance[sender] = extraMinBalance.get(sender, 0) + ASSET_MIN_BALANCE
+                    continue
+                for role, address in (("sender", sender), ("receiver", txn.receiver)):
+                    opted, frozen = holds(address, assetId)
+                    if not opted:
+                        problems.append(f"txn {n}: {role} {address} is not opted in to asset {assetId}")
+                    elif frozen:
+                        problems.append(f"txn {n}: asset {assetId} is frozen for {role} {address}")
+                units[(sender, assetId)] = units.get((sender, assetId), 0) - txn.amount
+                units[(txn.receiver, assetId)] = units.get((txn.receiver, assetId), 0) + txn.amount
+            elif txn.type == constants.assetconfig_txn and not txn.index:
+                extraMinBalance[sender] = extraMinBalance.get(sender, 0) + ASSET_MIN_BALANCE  # creator holds it
+
+        for address in set(algos) | set(extraMinBalance):
+            change = algos.get(address, 0)
+            extra = extraMinBalance.get(address, 0)
+            if change == 0 and not extra:
+                continue
+            snapshot = getSnapshot(self.algodClient, address)
+            balance = snapshot.balance() + self.algos.get(address, 0) + change
+            extra += self.extraMinBalance.get(address, 0)
+            if balance == 0 and not extra and len(snapshot.index()) == 0:
+                continue  # an account left empty is dropped by the ledger, receivers included
+            needed = snapshot.minBalance() + extra
+            if balance < needed:
+                problems.append(f"{address} would hold {balance} microAlgos, below its min-balance of {needed}")
+        for (address, assetId), change in units.items():
+            if change < 0:
+                opted, frozen, held = self.holding(address, assetId)
+                if opted and held + change < 0:
+                    problems.append(f"{address} holds {held} units of asset {assetId} but sends {-change}")
+
+        if not problems and self.simulate:
+            problems = simulateGroup(self.algodClient, txns)
+        if not problems:
+            for address, change in algos.items():
+                self.algos[address] = self.algos.get(address, 0) + change
+            for address, extra in extraMinBalance.items():
+                self.extraMinBalance[address] = self.extraMinBalance.get(address, 0) + extra
+            for key, change in units.items():
+                self.units[key] = self.units.get(key, 0) + change
+            self.optedIn |= optedIn
+        return problems
+
+    def prefetch(self, addresses, maxWorkers=8):
+        '''Fetch the snapshots of many accounts concurrently, those still fresh are left as they are'''
+        def fetch(address):
+            try:
+                getSnapshot(self.algodClient, address).current()
+            except Exception:
+                pass  # raised again by check() for the group that needs the account
+
+        with ThreadPoolExecutor(max_workers=max(1, maxWorkers)) as pool:
+            list(pool.map(fetch, set(addresses)))
+
+    def checkBatch(self, groups, maxWorkers=8, prefetchSize=1000):
+        '''{group position: problems} for every group of the batch that would be rejected'''
+        rejected = {}
+        start = 0
+        while start < len(groups):
+            end = start
+            addresses = set()
+            while end < len(groups) and len(addresses) < prefetchSize:
+                addresses.update(address for txn in groups[end]
+                                 for address in (txn.sender, getattr(txn, "receiver", None)) if address)
+                end += 1
+            self.prefetch(addresses, maxWorkers)
+
+            for n in range(start, end):
+                try:
+                    problems = self.check(groups[n])
+                except Exception as e:
+                    problems = [f"could not check the group: {e}"]
+                if problems:
+                    rejected[n] = problems
+            start = end
+        return rejected
+
+    def forget(self, addresses):
+        '''Drop the changes carried over for these addresses'''
+        gone = set(addresses)
+        for address in gone:
+            self.algos.pop(address, None)
+            self.extraMinBalance.pop(address, None)
+        self.units = {key: change for key, change in self.units.items() if key[0] not in gone}
+        self.optedIn = {key for key in self.optedIn if key[0] not in gone}
+
+
+def simulateGroup(algodClient, txns):
+    '''Run an unsigned group through the node's simulate endpoint, returns the failure if there is one'''
+    request = models.SimulateRequest(
+        txn_groups=[models.SimulateRequestTransactionGroup(txns=[transaction.SignedTransaction(txn, None)
+                                                                 for txn in txns])],
+        allow_empty_signatures=True)
+    try:
+        result = algodClient.simulate_transactions(request)
+    except Exception as e:
+        return [f"simulate failed: {e}"]
+    failure = (result.get("txn-groups") or [{}])[0].get("failure-message")
+    return [failure] if failure else []
+
+
+def preflight(algodClient, txns, simulate=False):
+    '''Problems with a single group, checked against fresh snapshots'''
+    return Preflight(algodClient, simulate).check(txns)
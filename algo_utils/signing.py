@@ -0,0 +1,93 @@
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import msgpack
+import nacl.signing
+from algosdk import constants, encoding
+
+from algo_utils.accounts import Account
+
+SIG_KEY = msgpack.packb("sig")
+TXN_KEY = msgpack.packb("txn")
+
+workerKeys = {}  # signing keys already built in this worker process
+
+
+def signChunk(chunk):
+    '''Worker: sign (unsigned txn msgpack, key seed) pairs and return the signed txn msgpack for each'''
+    signed = []
+    for txnBytes, seed in chunk:
+        signingKey = workerKeys.get(seed)
+        if signingKey is None:
+            signingKey = workerKeys[seed] = nacl.signing.SigningKey(seed)
+        signature = signingKey.sign(constants.txid_prefix + txnBytes).signature
+        # canonical msgpack of {"sig": signature, "txn": txn}, the same bytes SignedTransaction encodes to
+        signed.append(b"\x82" + SIG_KEY + msgpack.packb(signature) + TXN_KEY + txnBytes)
+    return signed
+
+
+class SigningStage:
+    '''Signs batches of transaction groups across a process pool'''
+
+    '''`keys` maps each sender address to its key: an Account, an account dict, a base64 private key or the 32-byte
+    seed. Only the msgpack bytes of every transaction and the seed of its sender are sent to the workers, and they
+    send back signed msgpack bytes, so no Transaction or SignedTransaction objects cross the process boundary. The
+    signed transactions of a group are concatenated into one blob, in group order, which is exactly the body
+    send_raw_transaction posts for a group. With workers=1 everything is signed in the calling process.'''
+
+    def __init__(self, keys, workers=None, chunkSize=256):
+        self.seeds = {address: self.seedOf(key) for address, key in keys.items()}
+        self.workers = workers or os.cpu_count() or 1
+        self.chunkSize = chunkSize
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    @classmethod
+    def fromAccounts(cls, accounts, **kwargs):
+        return cls({accountName["publicAdress"]: accountName for accountName in accounts}, **kwargs)
+
+    @staticmethod
+    def seedOf(key):
+        if isinstance(key, Account):
+            return key.signingKey
+        if isinstance(key, (bytes, bytearray)) and len(key) == 32:
+            return bytes(key)
+        if not isinstance(key, str):
+            key = key["privateKey"]
+        return base64.b64decode(key)[:32]
+
+    def signGroups(self, groups):
+        '''Sign every transaction of every group, returning one signed blob per group in the same order'''
+        items = []
+        sizes = []
+        for group in groups:
+            sizes.append(len(group))
+            for txn in group:
+                if txn.sender not in self.seeds:
+                    raise KeyError(f"no signing key for {txn.sender}")
+                items.append((base64.b64decode(encoding.msgpack_encode(txn)), self.seeds[txn.sender]))
+
+        chunks = [items[i:i + self.chunkSize] for i in range(0, len(items), self.chunkSize)]
+        if self.pool is None:
+            signedChunks = map(signChunk, chunks)
+        else:
+            signedChunks = self.pool.map(signChunk, chunks)  # results come back in submission order
+        signed = [stxn for chunk in signedChunks for stxn in chunk]
+
+        blobs = []
+        position = 0
+        for size in sizes:
+            blobs.append(b"".join(signed[position:position + size]))
+            position += size
+        return blobs
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from algo_utils.holdings import HoldingsIndex
+
+
+class AccountSnapshot:
+    '''One account_info fetch answering every balance question about an account'''
+
+    '''account_info is fetched once and only the algo balance, the min-balance and a HoldingsIndex of the asset
+    holdings are kept from it, so any balance question can be answered without another request and the response dict
+    is not held on to. A snapshot is stale after `ttl` seconds, or straight away after invalidate() is called, which
+    every write path does once its transaction is confirmed. The next question after that fetches the account again.'''
+
+    __slots__ = ("algodClient", "address", "ttl", "amount", "minimum", "holdings", "fetched")
+
+    def __init__(self, algodClient, address, ttl=4.0):
+        self.algodClient = algodClient
+        self.address = address
+        self.ttl = ttl
+        self.amount = None  # None until fetched and after invalidate()
+        self.minimum = 0
+        self.holdings = HoldingsIndex()
+        self.fetched = 0.0
+
+    def isStale(self):
+        return self.amount is None or time.monotonic() - self.fetched > self.ttl
+
+    def refresh(self):
+        '''Fetch account_info and rebuild the holdings index'''
+        info = self.algodClient.account_info(self.address)
+        self.holdings = HoldingsIndex.fromAccountInfo(info)
+        self.minimum = info.get("min-balance", 0)
+        self.amount = info["amount"]
+        self.fetched = time.monotonic()
+        return self
+
+    def invalidate(self):
+        self.amount = None
+
+    def current(self):
+        if self.isStale():
+            self.refresh()
+        return self
+
+    def balance(self):
+        '''Algo balance in microAlgos'''
+        return self.current().amount
+
+    def minBalance(self):
+        '''Minimum balance the account must keep in microAlgos'''
+        return self.current().minimum
+
+    def index(self):
+        '''HoldingsIndex of the current account_info'''
+        return self.current().holdings
+
+    def holding(self, assetId):
+        '''(amount, frozen) for an asset, or None when the account is not opted in'''
+        return self.index().lookup(assetId)
+
+    def assetAmount(self, assetId):
+        '''Units of the asset held, or None when the account is not opted in'''
+        return self.index().amount(assetId)
+
+    def isOptedIn(self, assetId):
+        return assetId in self.index()
+
+
+class SnapshotCache:
+    '''Snapshots shared between functions, one per (node, address)'''
+
+    '''At most `maxSize` snapshots are kept; the least recently used one is dropped to make room for a new one, so a
+    process that touches many accounts does not keep all of them. invalidate() looks each address up under every node
+    seen, which costs the same however many snapshots are cached.'''
+
+    def __init__(self, ttl=4.0, maxSize=10000):
+        self.ttl = ttl
+        self.maxSize = max(1, maxSize)
+        self.snapshots = OrderedDict()  # (node, address) -> AccountSnapshot, least recently used first
+        self.nodes = set()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def get(self, algodClient, address):
+        node = getattr(algodClient, "algod_address", None) or id(algodClient)
+        key = (node, address)
+        with self.lock:
+            snapshot = self.snapshots.get(key)
+            if snapshot is None or snapshot.algodClient is not algodClient:
+                snapshot = self.snapshots[key] = AccountSnapshot(algodClient, address, self.ttl)
+                self.nodes.add(node)
+                if len(self.snapshots) > self.maxSize:
+                    self.snapshots.popitem(last=False)
+            self.snapshots.move_to_end(key)
+        return snapshot
+
+    def invalidate(self, *addresses):
+        '''Mark the snapshots of the given addresses stale after a write'''
+        with self.lock:
+            for address in set(addresses):
+                for node in self.nodes:
+                    snapshot = self.snapshots.get((node, address))
+                    if snapshot is not None:
+                        snapshot.invalidate()
+
+    def clear(self):
+        with self.lock:
+            self.snapshots.clear()
+            self.nodes.clear()
+
+
+snapshots = SnapshotCache()  # shared by the balance checks and the write paths
+
+
+def getSnapshot(algodClient, address):
+    '''Shared AccountSnapshot for an address'''
+    return snapshots.get(algodClient, address)
+
+
+def lookupHoldings(algodClient, pairs, maxWorkers=8, refresh=False):
+    '''Answer many (address, assetId) questions with one account fetch per distinct address'''
+
+    '''Returns {(address, assetId): (amount, frozen) or None when not opted in}. The accounts are read through the
+    shared snapshots, fetched concurrently by up to `maxWorkers` threads (refresh=True fetches them even when the
+    snapshot is still fresh). A pair whose account could not be fetched maps to the exception.'''
+    byAddress = {}
+    for address, assetId in pairs:
+        byAddress.setdefault(address, []).append(assetId)
+
+    def fetch(address):
+        snapshot = getSnapshot(algodClient, address)
+        try:
+            return snapshot.refresh().holdings if refresh else snapshot.index()
+        except Exception as e:
+            return e
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, maxWorkers)) as pool:
+        for (address, assetIds), index in zip(byAddress.items(), pool.map(fetch, byAddress)):
+            for assetId in assetIds:
+                results[(address, assetId)] = index if isinstance(index, Exception) else index.lookup(assetId)
+    return results
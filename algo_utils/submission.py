@@ -0,0 +1,89 @@
+import base64
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from algo_utils.watcher import BlockWatcher
+
+
+class SubmissionEngine:
+    '''Pipelined submit-then-confirm engine with a bounded in-flight window'''
+
+    '''Instead of calling send_transaction and then wait_for_confirmation for every transaction, signed transactions
+    (or signed groups) are sent straight away and their txids are kept in a pending table. Up to `window` transactions
+    can be in flight at the same time; when the window is full the engine watches the next round before sending more.
+    Confirmations are resolved together once per round by a BlockWatcher from the txids of each new block, one request
+    per round however many transactions are in flight, and each Future is resolved with {"confirmed-round", "txid"}.
+    Several engines can share one watcher; without one the engine follows the blocks with a watcher of its own.
+    A transaction that is not confirmed within `waitRounds` rounds of being sent fails with ConfirmationTimeoutError;
+    the round it is sent in is read again whenever the engine had nothing in flight, so an engine left idle does not
+    count from a round long past.'''
+
+    def __init__(self, algodClient, window=16, waitRounds=4, watcher=None):
+        self.algodClient = algodClient
+        self.window = max(1, window)
+        self.waitRounds = waitRounds
+        self.watcher = watcher or BlockWatcher(algodClient)
+        self.pending = {}  # txid -> (future, last round to wait for)
+        self.lastRound = None
+
+    def inFlight(self):
+        '''Number of transactions sent but not yet resolved'''
+        return len(self.pending)
+
+    def submit(self, signedTxns):
+        '''Send a signed transaction or a signed group and return a Future for its confirmation'''
+        if not isinstance(signedTxns, (list, tuple)):
+            signedTxns = [signedTxns]
+        if len(signedTxns) == 1:
+            return self.track(lambda: self.algodClient.send_transaction(signedTxns[0]))
+        return self.track(lambda: self.algodClient.send_transactions(signedTxns))  # a group is confirmed through its first txid
+
+    def submitRaw(self, blob):
+        '''Send a transaction or group that is already signed and msgpack encoded, as SigningStage returns them'''
+        return self.track(lambda: self.algodClient.send_raw_transaction(base64.b64encode(blob)))
+
+    def track(self, send):
+        while len(self.pending) >= self.window:
+            self.watchRound()
+
+        future = Future()
+        try:
+            txid = send()
+        except Exception as e:
+            future.set_exception(e)
+            return future
+
+        if txid in self.pending:
+            return self.pending[txid][0]  # the same transaction sent twice
+
+        if self.lastRound is None or not self.pending:
+            self.lastRound = self.currentRound()
+        lastValid = self.lastRound + self.waitRounds
+        future = self.watcher.watch(txid, lastValid)
+        self.pending[txid] = (future, lastValid)
+        future.add_done_callback(lambda f: self.pending.pop(txid, None))
+        return future
+
+    def currentRound(self):
+        if self.watcher.isRunning() and self.watcher.lastRound is not None:
+            return self.watcher.lastRound  # kept current by the watcher thread
+        return self.algodClient.status()["last-round"]
+
+    def signAndSubmit(self, txns, privateKey):
+        '''Sign every transaction with the given key and submit them one by one, returning one Future each'''
+        return [self.submit(txn.sign(privateKey)) for txn in txns]
+
+    def watchRound(self):
+        '''Resolve every pending transaction confirmed so far and wait for the next round'''
+        if not self.pending:
+            return
+        if self.watcher.isRunning():
+            wait([future for future, lastValid in list(self.pending.values())], return_when=FIRST_COMPLETED)
+        else:
+            self.watcher.step()
+        self.lastRound = self.watcher.lastRound
+
+    def waitAll(self):
+        '''Block until every submitted transaction has been confirmed, rejected or has timed out'''
+        while self.pending:
+            self.watchRound()
+
@@ -0,0 +1,120 @@
+from algosdk import transaction
+
+from algo_utils.params import suggestedParams, uniqueNote
+from algo_utils.preflight import Preflight
+from algo_utils.snapshot import snapshots
+
+MAX_LEGS = 16  # largest atomic group the network accepts
+
+
+def addressOf(accountName):
+    '''Address of an Account, an account dict or an address string'''
+    return accountName if isinstance(accountName, str) else accountName["publicAdress"]
+
+
+class SwapBuilder:
+    '''Settlement of any number of parties as one atomic group'''
+
+    '''Legs are added in the order they run: pay() for microAlgos, transfer() for asset units and optIn() for a
+    receiver that does not hold the asset yet (an opt-in has to come before the transfers it receives). check() looks
+    at every leg against one shared snapshot per account through a Preflight, the same way the node settles a group:
+    the algo balance of every account must stay above its min-balance once the fees, payments and new opt-ins are
+    counted, every asset sender must hold enough units, and every asset receiver must be opted in. execute() fetches
+    the params once, assigns the group ID once, signs each leg with its sender's key and sends the whole group with a
+    single send_transactions call, so an N-party settlement is one submission and one confirmation wait.'''
+
+    def __init__(self, algodClient, fee=1000, simulate=False):
+        self.algodClient = algodClient
+        self.fee = fee
+        self.simulate = simulate
+        self.legs = []  # (kind, sender account, receiver address, assetId, amount)
+
+    def __len__(self):
+        return len(self.legs)
+
+    def addLeg(self, kind, sender, receiver, assetId, amount):
+        if len(self.legs) >= MAX_LEGS:
+            raise ValueError(f"a group holds at most {MAX_LEGS} transactions")
+        if amount < 0:
+            raise ValueError("amounts cannot be negative")
+        self.legs.append((kind, sender, addressOf(receiver), assetId, amount))
+        return self
+
+    def pay(self, sender, receiver, microAlgos):
+        return self.addLeg("pay", sender, receiver, None, microAlgos)
+
+    def transfer(self, sender, receiver, assetId, amount):
+        return self.addLeg("axfer", sender, receiver, assetId, amount)
+
+    def optIn(self, accountName, assetId):
+        return self.addLeg("optin", accountName, accountName, assetId, 0)
+
+    def addresses(self):
+        '''Every account the group touches, in first-seen order'''
+        seen = {}
+        for kind, sender, receiver, assetId, amount in self.legs:
+            seen.setdefault(addressOf(sender))
+            seen.setdefault(receiver)
+        return list(seen)
+
+    def check(self, txns=None):
+        '''List of the reasons the node would reject the group, empty when every leg is funded and opted in'''
+        if not self.legs:
+            return ["the swap has no legs"]
+        return Preflight(self.algodClient, self.simulate).check(txns or self.build())
+
+    def build(self):
+        '''Unsigned transactions of the group with the group ID assigned'''
+        param = suggestedParams(self.algodClient)
+        param.fee = self.fee
+        param.flat_fee = True
+
+        txns = []
+        for kind, sender, receiver, assetId, amount in self.legs:
+            senderAddress = addressOf(sender)
+            if kind == "pay":
+                txns.append(transaction.PaymentTxn(senderAddress, param, receiver, amount, note=uniqueNote()))
+            elif kind == "optin":
+                txns.append(transaction.AssetOptInTxn(sender=senderAddress, sp=param, index=assetId, note=uniqueNote()))
+            else:
+                txns.append(transaction.AssetTransferTxn(sender=senderAddress, sp=param, receiver=receiver,
+                                                         amt=amount, index=assetId, note=uniqueNote()))
+        transaction.assign_group_id(txns)
+        return txns
+
+    def sign(self, txns):
+        return [txn.sign(sender["privateKey"]) for txn, (kind, sender, *rest) in zip(txns, self.legs)]
+
+    def execute(self, waitRounds=4):
+        '''Check, build, sign and send the group, returns the confirmation of its first transaction'''
+        txns = self.build()
+        problems = self.check(txns)
+        if problems:
+            raise ValueError("swap rejected: " + "; ".join(problems))
+
+        signedGroup = self.sign(txns)
+        txId = self.algodClient.send_transactions(signedGroup)  # one submission for every leg
+        try:
+            return transaction.wait_for_confirmation(self.algodClient, txId, waitRounds)
+        finally:
+            snapshots.invalidate(*self.addresses())
+
+
+def atomicTransfer(algodClient, account1, account2, assetId, assetAmount, microAlgosCost):
+    '''Perform atomic transfer'''
+    '''The atomic transfer is similar to a normal transfer function, however it creates a group transaction in which the transfer of both algos
+    from account A to Account B, and the transfer of UCTZAR from account B to Account A take place together with one transactionID generated. 
+        '''
+    assetBalance = None
+    try:
+        swap = SwapBuilder(algodClient)  # A two leg swap; SwapBuilder takes up to 16 legs across any accounts and assets
+        swap.pay(account1, account2, microAlgosCost) # Transfer of algos from accountA to accountB
+        swap.transfer(account2, account1, assetId, assetAmount) #Transfer of ASA from account2 to account1
+
+        # The legs are checked for funds and opt-ins before signing, the group ID is assigned in leg order and the group is sent with one call
+        results = swap.execute(4)  # 4 rounds for verification
+        print("Atomic transfer successful.")
+        return results
+
+    except Exception as e:
+        print(f"Error in atomic transfer: {e}")
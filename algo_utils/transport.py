@@ -0,0 +1,269 @@
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+from urllib import parse
+
+import msgpack
+from algosdk import constants, encoding, error
+from algosdk.v2client import algod
+
+from algo_utils.instrument import endpointName
+
+IDEMPOTENT = ("GET", "HEAD")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CONNECTION_ERRORS = (OSError, http.client.HTTPException)  # resets, refusals and timeouts are all OSErrors
+ALREADY_SUBMITTED = ("already in ledger", "already in pool")
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status, body, retryAfter=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+        self.retryAfter = retryAfter
+
+
+def alreadySubmitted(message):
+    '''Whether the error of a POST /transactions says the node already has the transaction'''
+    return any(reason in str(message) for reason in ALREADY_SUBMITTED)
+
+
+def submittedTxid(data):
+    '''Txid of the first transaction in a POST /transactions body, the one algod answers with'''
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(data)
+    return encoding.msgpack_decode(next(unpacker)).get_txid()
+
+
+class TokenBucket:
+    '''Allows `rate` requests per second with bursts of up to `burst`'''
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        '''Take a token, sleeping until one is free; returns the seconds waited'''
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HttpTransport:
+    '''Keep-alive connection pool to one algod node with timeouts, retries and rate limits'''
+
+    '''Up to `maxConnections` HTTP/1.1 connections are kept open and reused, so the TCP and TLS handshakes are paid
+    once per connection instead of once per call. Reads (GET) that fail with a connection error, a timeout or a
+    429/5xx status are retried up to `retries` times with full-jitter exponential backoff, honouring Retry-After.
+    Writes are only retried when a reused connection turned out to be closed before any response came back, which a
+    node can not have acted on; wasResent() tells the caller when that happened. `rateLimits` maps endpoint names (as endpointName gives them, e.g. "account_info",
+    or "*" for every other endpoint) to requests per second. stats() reports the pool, retry and throttling counts,
+    and every request is reported to `instrumentation` with its retries when one is given.'''
+
+    def __init__(self, algodAddress, maxConnections=8, timeout=10.0, retries=3, backoff=0.1, maxBackoff=5.0,
+                 rateLimits=None, instrumentation=None):
+        url = parse.urlsplit(algodAddress)
+        self.secure = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.secure else 80)
+        self.basePath = url.path.rstrip("/")
+        self.maxConnections = max(1, maxConnections)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.buckets = {endpoint: TokenBucket(rate) for endpoint, rate in (rateLimits or {}).items()}
+        self.instrumentation = instrumentation
+
+        self.idle = []  # open connections ready for reuse, most recent last
+        self.slots = threading.BoundedSemaphore(self.maxConnections)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "opened": 0, "reused": 0, "closed": 0,
+                         "throttledSeconds": 0.0}
+        self.retriesByEndpoint = {}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def connect(self):
+        self.count("opened")
+        if self.secure:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def checkout(self):
+        '''(connection, reused) from the pool, opening a new one when none is idle'''
+        self.slots.acquire()
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        if connection is None:
+            return self.connect(), False
+        self.count("reused")
+        return connection, True
+
+    def checkin(self, connection, keep):
+        if keep:
+            with self.lock:
+                self.idle.append(connection)
+        else:
+            connection.close()
+            self.count("closed")
+        self.slots.release()
+
+    def once(self, method, path, body, headers, timeout):
+        '''One attempt: (status, body bytes), raises a connection error or RetryableStatus'''
+        connection, reused = self.checkout()
+        keep = False
+        try:
+            connection.timeout = timeout
+            if connection.sock is None:
+                connection.connect()
+                connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # small requests go out at once
+            connection.sock.settimeout(timeout)
+            connection.request(method, self.basePath + path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            keep = not response.will_close
+        except CONNECTION_ERRORS as e:
+            e.reusedConnection = reused
+            raise
+        finally:
+            self.checkin(connection, keep)
+
+        if response.status in RETRY_STATUSES:
+            retryAfter = response.getheader("Retry-After")
+            raise RetryableStatus(response.status, data, float(retryAfter) if retryAfter and retryAfter.isdigit() else None)
+        return response.status, data
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        '''Send a request, retrying as the policy allows; returns (status, body bytes)'''
+        endpoint = endpointName(method, path.split("?")[0])
+        bucket = self.buckets.get(endpoint) or self.buckets.get("*")
+        if bucket is not None:
+            self.count("throttledSeconds", bucket.acquire())
+
+        self.count("requests")
+        start = time.perf_counter()
+        attempt = 0
+        self.local.resent = False
+        while True:
+            try:
+                status, data = self.once(method, path, body, headers or {}, timeout or self.timeout)
+                self.local.received = len(data)
+                self.report(endpoint, start, True, body, data, attempt)
+                return status, data
+            except (RetryableStatus,) + CONNECTION_ERRORS as e:
+                staleConnection = getattr(e, "reusedConnection", False) and isinstance(
+                    e, (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected))
+                retryable = method in IDEMPOTENT or staleConnection
+                if not retryable or attempt >= self.retries:
+                    self.count("failures")
+                    self.report(endpoint, start, False, body, getattr(e, "body", b""), attempt, e)
+                    if isinstance(e, RetryableStatus):
+                        return e.status, e.body  # the caller turns the status into an error
+                    raise
+                attempt += 1
+                self.local.resent = method not in IDEMPOTENT
+                self.count("retries")
+                with self.lock:
+                    self.retriesByEndpoint[endpoint] = self.retriesByEndpoint.get(endpoint, 0) + 1
+                if not staleConnection:
+                    delay = random.uniform(0, min(self.maxBackoff, self.backoff * 2 ** attempt))
+                    time.sleep(max(delay, getattr(e, "retryAfter", None) or 0))
+
+    def wasResent(self):
+        '''Whether the last request of this thread was a write sent again after a stale connection'''
+        return getattr(self.local, "resent", False)
+
+    def lastResponseSize(self):
+        '''Bytes in the body of the last response this thread read'''
+        return getattr(self.local, "received", 0)
+
+    def report(self, endpoint, start, ok, body, data, retries, e=None):
+        if self.instrumentation is not None:
+            self.instrumentation.record(endpoint, time.perf_counter() - start, ok, len(body or b""), len(data or b""),
+                                        retries, e)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["idle"] = len(self.idle)
+            stats["retriesByEndpoint"] = dict(self.retriesByEndpoint)
+        return stats
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    '''AlgodClient that sends every request through an HttpTransport'''
+
+    '''Only algod_request is replaced, the same as FakeAlgodClient does, so every SDK method and every function that
+    takes an algodClient works unchanged. Headers, the API version prefix and the error types are the SDK's. A
+    submission the transport had to send again, that then comes back "already in ledger" or "already in pool", was
+    taken the first time and is answered with its txid like any other.'''
+
+    def __init__(self, algod_token, algod_address, headers=None, transport=None, **transportOptions):
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = transport or HttpTransport(algod_address, **transportOptions)
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        submit = method == "POST" and requrl == "/transactions"
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, body = self.transport.request(method, requrl, data, header, timeout)
+        if status >= 400:
+            message = body.decode("utf-8", "replace")
+            details = {}
+            try:
+                details = json.loads(message)
+                message = details["message"]
+            except Exception:
+                pass
+            if submit and status == 400 and self.transport.wasResent() and alreadySubmitted(message):
+                return {"txId": submittedTxid(data)}  # the connection dropped after the node took it
+            raise error.AlgodHTTPError(message, status, details.get("data") if isinstance(details, dict) else None)
+        if response_format == "json":
+            if not body:
+                return {}
+            try:
+                return json.loads(body)
+            except Exception as e:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+        return body
+
+    def transportStats(self):
+        return self.transport.stats()
+
+    def close(self):
+        self.transport.close()
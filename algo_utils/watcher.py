@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import Future
+
+from algosdk import error
+
+
+class BlockWatcher:
+    '''Confirms every pending transaction from the list of txids in each new block'''
+
+    '''Instead of asking pending_transaction_info about every txid, the watcher follows the chain with
+    status_after_block and reads the txids of each new round with get_block_txids. Those are matched against the
+    registry of waits and every match is resolved in the same pass, so the requests per round stay the same however
+    many transactions are pending. A wait that is not in any block up to its last valid round can no longer be
+    confirmed and fails with ConfirmationTimeoutError. The txids of the last `keepRounds` blocks are kept, so a
+    transaction registered just after its block was read still resolves.
+
+    The result of a wait is {"confirmed-round", "txid"}; watch(..., details=True) fetches the pending transaction
+    info once a txid has been seen in a block, for callers that need e.g. the "asset-index". A transaction dropped
+    from the pool is only noticed when its last valid round passes. step() reads the rounds closed so far and waits
+    for the next one; start() runs it on a background thread.'''
+
+    def __init__(self, algodClient, keepRounds=8):
+        self.algodClient = algodClient
+        self.keepRounds = keepRounds
+        self.lastRound = None  # last round whose txids were read
+        self.waits = {}  # txid -> (future, last valid round, details)
+        self.recent = {}  # round -> set of txids, the last keepRounds blocks
+        self.lock = threading.Lock()
+        self.stepLock = threading.Lock()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.confirmed = 0
+        self.expired = 0
+
+    def pendingCount(self):
+        return len(self.waits)
+
+    def watch(self, txid, lastValid, details=False):
+        '''Future resolved once the txid is in a block, the same Future for a txid already watched'''
+        with self.lock:
+            if txid in self.waits:
+                return self.waits[txid][0]
+            idle = not self.waits and self.thread is None
+        if self.lastRound is None or idle:
+            # the current block may hold the txid already; the rounds an idle watcher missed had nothing to look for
+            self.lastRound = max(self.lastRound or 0, self.algodClient.status()["last-round"] - 1)
+
+        future = Future()
+        future.txid = txid
+        with self.lock:
+            if txid in self.waits:
+                return self.waits[txid][0]
+            for roundNum, txids in self.recent.items():
+                if txid in txids:
+                    self.resolve(future, txid, roundNum, details)
+                    return future
+            self.waits[txid] = (future, lastValid, details)
+        return future
+
+    def resolve(self, future, txid, roundNum, details):
+        if details:
+            try:
+                future.set_result(self.algodClient.pending_transaction_info(txid))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future.set_result({"confirmed-round": roundNum, "txid": txid})
+        self.confirmed += 1
+
+    def readRound(self, roundNum):
+        '''Resolve the waits confirmed in one round and expire the ones that can no longer be'''
+        txids = set(self.algodClient.get_block_txids(roundNum).get("blockTxids") or [])
+        matched = []
+        expired = []
+        with self.lock:
+            self.recent[roundNum] = txids
+            self.recent.pop(roundNum - self.keepRounds, None)
+            for txid in txids & self.waits.keys():
+                future, lastValid, details = self.waits.pop(txid)
+                matched.append((future, txid, details))
+            for txid, (future, lastValid, details) in list(self.waits.items()):
+                if lastValid <= roundNum:
+                    del self.waits[txid]
+                    expired.append((future, txid))
+
+        for future, txid, details in matched:
+            self.resolve(future, txid, roundNum, details)
+        for future, txid in expired:
+            self.expired += 1
+            future.set_exception(error.ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out"))
+
+    def step(self):
+        '''Read every round closed since the last step, then wait for the next round'''
+        with self.stepLock:
+            if self.lastRound is None:
+                self.lastRound = self.algodClient.status()["last-round"] - 1
+            status = self.algodClient.status_after_block(self.lastRound)
+            for roundNum in range(self.lastRound + 1, status["last-round"] + 1):
+                self.readRound(roundNum)
+                self.lastRound = roundNum
+
+    def waitAll(self):
+        '''Step until every watched transaction is resolved'''
+        while self.waits:
+            self.step()
+
+    def start(self):
+        '''Follow the chain on a background thread until stop()'''
+        if self.thread is not None:
+            return self
+        self.stopping.clear()
+
+        def run():
+            while not self.stopping.is_set():
+                try:
+                    self.step()
+                except Exception as e:
+                    print(f"Error following blocks: {e}")
+                    self.stopping.wait(1.0)
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+
+    def isRunning(self):
+        return self.thread is not None
+
+    def stats(self):
+        return {"pending": len(self.waits), "confirmed": self.confirmed, "expired": self.expired,
+                "lastRound": self.lastRound}
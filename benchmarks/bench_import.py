@@ -0,0 +1,65 @@
+'''Start-up benchmark: how long importing algo_utils and starting its command line take in a fresh interpreter
+
+Each case runs in a new python process so nothing is already imported, and the median of --runs wall times is
+reported next to a bare `python -c pass` baseline. Importing the package should stay within a millisecond of the
+baseline and `python -m algo_utils --help` within what argparse itself costs; the workflow cases show what loading
+the submodules with algosdk and numpy costs on top:
+
+    python benchmarks/bench_import.py --runs 20 --output import_results.json
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "baseline": ["-c", "pass"],
+    "import_package": ["-c", "import algo_utils"],
+    "cli_help": ["-m", "algo_utils", "--help"],
+    "first_workflow": ["-c", "import algo_utils; algo_utils.ASAmint"],
+    "all_workflows": ["-c", "import algo_utils; [getattr(algo_utils, name) for name in algo_utils.__all__]"],
+}
+
+
+def timeCase(arguments, runs):
+    '''Wall seconds of every run of `python arguments` started from the repository root'''
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--output", default="import_results.json")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or CASES:
+        times = timeCase(CASES[name], args.runs)
+        results[name] = {"medianMs": round(statistics.median(times) * 1000, 2),
+                         "minMs": round(min(times) * 1000, 2), "maxMs": round(max(times) * 1000, 2)}
+        print(f"{name:16} median {results[name]['medianMs']:8.2f} ms  min {results[name]['minMs']:8.2f} ms")
+
+    if "baseline" in results:
+        for name, r in results.items():
+            r["overBaselineMs"] = round(r["medianMs"] - results["baseline"]["medianMs"], 2)
+
+    report = {"config": {"runs": args.runs}, "python": platform.python_version(), "cases": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+'''Throughput benchmark for the mint, opt-in, swap and distribution workflows against the offline FakeAlgod
+
+Every workflow runs against a fresh FakeAlgod with simulated round time and request latency, so the numbers are
+repeatable and do not need testnet accounts. For each workflow the benchmark records the wall time, transactions
+per second, the p50/p99 confirmation latency seen by the client and the HTTP calls made per endpoint, and writes
+them to a JSON file that can be diffed between releases:
+
+    python benchmarks/bench_workflows.py --recipients 64 --output bench_results.json
+'''
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from algo_utils.bulk_optin import bulkOptIn  # noqa: E402
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient  # noqa: E402
+from algo_utils.params import paramsCache  # noqa: E402
+from algo_utils.snapshot import snapshots  # noqa: E402
+from algo_utils.watcher import BlockWatcher  # noqa: E402
+
+
+def loadScript(fileName, moduleName):
+    '''Import one of the exam scripts, whose file names contain spaces'''
+    spec = importlib.util.spec_from_file_location(moduleName, os.path.join(ROOT, fileName))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+atomicScript = loadScript("Q5.2 atomic_transfer.py", "atomic_transfer")
+nftScript = loadScript("Q6.6 fractional_nft_algorand.py", "fractional_nft_algorand")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def newLedger(args, accounts):
+    fake = FakeAlgod(roundTime=args.round_time, latency=args.latency)
+    for acct in accounts:
+        fake.fund(acct["publicAdress"], 100 * 10**6)
+    paramsCache.invalidate()
+    snapshots.clear()
+    return fake, FakeAlgodClient(fake)
+
+
+def measure(fake, workflow):
+    '''Run a workflow with its output muted and collect the numbers from the fake node'''
+    fake.resetCounters()
+    before = len(fake.txns)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        workflow()
+    elapsed = time.perf_counter() - start
+
+    txns = len(fake.txns) - before
+    latencies = fake.confirmationLatencies()
+    return {
+        "seconds": round(elapsed, 4),
+        "txns": txns,
+        "txnsPerSec": round(txns / elapsed, 2) if elapsed else None,
+        "confirmP50": round(percentile(latencies, 50), 4) if latencies else None,
+        "confirmP99": round(percentile(latencies, 99), 4) if latencies else None,
+        "httpCalls": sum(fake.calls.values()),
+        "httpCallsByEndpoint": dict(sorted(fake.calls.items())),
+        "bytesSent": fake.bytesIn,
+    }
+
+
+def benchMint(args):
+    creator = atomicScript.accountGen()
+    fake, client = newLedger(args, [creator])
+    return measure(fake, lambda: [atomicScript.ASAmint(client, creator, "BENCH", 10) for _ in range(args.mints)])
+
+
+def benchOptInSerial(args):
+    creator = atomicScript.accountGen()
+    holders = [atomicScript.accountGen() for _ in range(args.recipients)]
+    fake, client = newLedger(args, [creator] + holders)
+    assetId = fake.createAsset(creator["publicAdress"], 10**6)
+    return measure(fake, lambda: [nftScript.optIn(client, holder, assetId) for holder in holders])
+
+
+def benchOptInBulk(args):
+    creator = atomicScript.accountGen()
+    holders = [atomicScript.accountGen() for _ in range(args.recipients)]
+    fake, client = newLedger(args, [creator] + holders)
+    assetId = fake.createAsset(creator["publicAdress"], 10**6)
+    return measure(fake, lambda: bulkOptIn(client, holders, assetId, sponsor=creator))
+
+
+def benchSwap(args):
+    buyer = atomicScript.accountGen()
+    seller = atomicScript.accountGen()
+    fake, client = newLedger(args, [buyer, seller])
+    assetId = fake.createAsset(seller["publicAdress"], 10**6)
+    fake.optIn(buyer["publicAdress"], assetId)
+    return measure(fake, lambda: [atomicScript.atomicTransfer(client, buyer, seller, assetId, 1, 10**5)
+                                  for _ in range(args.swaps)])
+
+
+def distributionSetup(args):
+    sender = nftScript.accountGen()
+    recipients = [nftScript.accountGen() for _ in range(args.recipients)]
+    fake, client = newLedger(args, [sender] + recipients)
+    totalUnits = 10**6
+    assetId = fake.createAsset(sender["publicAdress"], totalUnits, decimals=6)
+    for recipient in recipients:
+        fake.optIn(recipient["publicAdress"], assetId)
+    fractions = [1 / (args.recipients + 1)] * args.recipients
+    return fake, client, sender, recipients, assetId, fractions, totalUnits
+
+
+def benchDistribution(args):
+    fake, client, sender, recipients, assetId, fractions, totalUnits = distributionSetup(args)
+    return measure(fake, lambda: nftScript.distributeNft(client, sender, assetId, recipients, fractions, totalUnits))
+
+
+def benchDistributionWatched(args):
+    fake, client, sender, recipients, assetId, fractions, totalUnits = distributionSetup(args)
+    watcher = BlockWatcher(client)
+    return measure(fake, lambda: nftScript.distributeNft(client, sender, assetId, recipients, fractions, totalUnits,
+                                                         watcher=watcher))
+
+
+def benchDistributionBatched(args):
+    fake, client, sender, recipients, assetId, fractions, totalUnits = distributionSetup(args)
+    return measure(fake, lambda: nftScript.distributeNftBatched(client, sender, assetId, recipients, fractions, totalUnits))
+
+
+WORKFLOWS = {
+    "mint": benchMint,
+    "optin_serial": benchOptInSerial,
+    "optin_bulk": benchOptInBulk,
+    "swap": benchSwap,
+    "distribution": benchDistribution,
+    "distribution_watched": benchDistributionWatched,
+    "distribution_batched": benchDistributionBatched,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=32, help="accounts per opt-in and distribution run")
+    parser.add_argument("--mints", type=int, default=5)
+    parser.add_argument("--swaps", type=int, default=5)
+    parser.add_argument("--round-time", type=float, default=0.05, help="simulated seconds per round")
+    parser.add_argument("--latency", type=float, default=0.001, help="simulated seconds per HTTP request")
+    parser.add_argument("--only", nargs="*", choices=sorted(WORKFLOWS), help="run only these workflows")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or WORKFLOWS:
+        results[name] = WORKFLOWS[name](args)
+        r = results[name]
+        print(f"{name:22} {r['seconds']:8.3f}s {r['txnsPerSec'] or 0:9.1f} txn/s  "
+              f"p50 {r['confirmP50'] or 0:.3f}s  p99 {r['confirmP99'] or 0:.3f}s  {r['httpCalls']} http calls")
+
+    report = {
+        "config": {"recipients": args.recipients, "mints": args.mints, "swaps": args.swaps,
+                   "roundTime": args.round_time, "latency": args.latency},
+        "python": platform.python_version(),
+        "workflows": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from algosdk import error
+
+from algo_utils import aio
+from algo_utils.accounts import accountGen
+from algo_utils.fake_algod import FakeAlgod, serveFakeAlgod
+
+
+@pytest.fixture
+def served():
+    fake = FakeAlgod(roundTime=0.01)
+    server = serveFakeAlgod(fake)
+    yield fake, server.address
+    server.shutdown()
+
+
+def run(address, workflow):
+    '''Run workflow(client) on a fresh AsyncAlgodClient and close it afterwards'''
+    async def main():
+        client = aio.AsyncAlgodClient("", address)
+        try:
+            return await workflow(client)
+        finally:
+            client.close()
+    return asyncio.run(main())
+
+
+def testIdenticalTransactionsGetTheirOwnTxids(served):
+    fake, address = served
+    creator, holder = accountGen(), accountGen()
+    fake.fund(creator["publicAdress"], 10 ** 7)
+    fake.fund(holder["publicAdress"], 10 ** 6)
+
+    async def workflow(client):
+        first = await aio.ASAmint(client, creator, "X", 10)
+        second = await aio.ASAmint(client, creator, "X", 10)
+        await aio.optIn(client, holder, first)
+        paid = await aio.distributeNft(client, creator, first, [holder, holder], [0.2, 0.2], 10)
+        return first, second, paid
+
+    first, second, paid = run(address, workflow)
+    assert first is not None and second is not None and first != second
+    assert paid is not None and len(paid) == 2
+    assert fake.accounts[holder["publicAdress"]]["assets"][first]["amount"] == 4
+
+
+def testWaitForAnUnknownTxidExpires(served):
+    fake, address = served
+
+    async def workflow(client):
+        with pytest.raises(error.ConfirmationTimeoutError):
+            await asyncio.wait_for(client.wait_for_confirmation("A" * 52, 4), 2)
+        return client.pending
+
+    assert run(address, workflow) == {}
@@ -0,0 +1,91 @@
+import base64
+
+import pytest
+from algosdk import encoding, error
+
+from algo_utils.accounts import accountGen
+from algo_utils.distribution import distributeNftBatched
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient
+from algo_utils.params import paramsCache
+from algo_utils.snapshot import getSnapshot, snapshots
+
+
+class FailingSendClient(FakeAlgodClient):
+    '''Refuses the `failAt`-th submission with a 503, after the retries a real client would have made'''
+
+    def __init__(self, fake, failAt):
+        super().__init__(fake)
+        self.failAt = failAt
+        self.sends = 0
+
+    def algod_request(self, method, requrl, *args, **kwargs):
+        if method == "POST" and requrl == "/transactions":
+            self.sends += 1
+            if self.sends == self.failAt:
+                raise error.AlgodHTTPError("node is temporarily unavailable", 503)
+        return super().algod_request(method, requrl, *args, **kwargs)
+
+
+class BrokenSigningStage:
+    '''Signs the first group and then fails, like a worker process that died'''
+
+    def __init__(self, account):
+        self.account = account
+
+    def signGroups(self, groups):
+        for n, txns in enumerate(groups):
+            if n == 1:
+                raise RuntimeError("signing worker died")
+            yield b"".join(base64.b64decode(encoding.msgpack_encode(txn.sign(self.account["privateKey"])))
+                           for txn in txns)
+
+
+@pytest.fixture(autouse=True)
+def freshCaches():
+    paramsCache.invalidate()
+    snapshots.clear()
+    yield
+    paramsCache.invalidate()
+    snapshots.clear()
+
+
+def setup(client, fake, recipientCount=6):
+    sender = accountGen()
+    fake.fund(sender["publicAdress"], 10 ** 7)
+    assetId = fake.createAsset(sender["publicAdress"], 600)
+    recipients = [accountGen() for _ in range(recipientCount)]
+    for recipient in recipients:
+        fake.fund(recipient["publicAdress"], 10 ** 6)
+        fake.optIn(recipient["publicAdress"], assetId)
+    return sender, recipients, assetId
+
+
+def held(fake, account, assetId):
+    return fake.accounts[account["publicAdress"]]["assets"][assetId]["amount"]
+
+
+def testFailedGroupKeepsTheOthersOutcomes():
+    fake = FakeAlgod(roundTime=0.005)
+    client = FailingSendClient(fake, failAt=2)
+    sender, recipients, assetId = setup(client, fake)
+
+    outcomes = distributeNftBatched(client, sender, assetId, recipients, [1 / 6] * 6, 600, groupSize=2)
+    assert [outcome["status"] for outcome in outcomes] == ["confirmed", "failed", "confirmed"]
+    assert outcomes[1]["receivers"] == [recipient["publicAdress"] for recipient in recipients[2:4]]
+    assert "unavailable" in outcomes[1]["error"]
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [100, 100, 0, 0, 100, 100]
+    assert fake.calls.get("pending", 0) == 0  # confirmed from the blocks, not polled per txid
+
+
+def testErrorWhileSendingStillConfirmsWhatWentOut():
+    fake = FakeAlgod(roundTime=0.005)
+    client = FakeAlgodClient(fake)
+    sender, recipients, assetId = setup(client, fake, recipientCount=4)
+    assert getSnapshot(client, recipients[0]["publicAdress"]).assetAmount(assetId) == 0
+
+    outcomes = distributeNftBatched(client, sender, assetId, recipients, [0.25] * 4, 600, groupSize=2,
+                                    signingStage=BrokenSigningStage(sender))
+    assert [outcome["status"] for outcome in outcomes] == ["confirmed", "unsent"]
+    assert outcomes[0]["round"] > 0 and outcomes[1]["txid"]
+    assert getSnapshot(client, recipients[0]["publicAdress"]).assetAmount(assetId) == 150  # invalidated
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [150, 150, 0, 0]
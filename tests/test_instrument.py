@@ -0,0 +1,58 @@
+import types
+
+import pytest
+
+from algo_utils import instrument
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient, serveFakeAlgod
+from algo_utils.instrument import Instrumentation, MemorySink
+from algo_utils.transport import PooledAlgodClient
+
+
+def event(endpoint, seconds, ok=True):
+    return {"ts": 0.0, "endpoint": endpoint, "seconds": seconds, "ok": ok, "bytesSent": 10, "bytesReceived": 100,
+            "retries": 0}
+
+
+def testMemorySinkKeepsABoundedSample():
+    sink = MemorySink(reservoirSize=100, seed=1)
+    for n in range(20000):
+        sink.emit(event("status", (n % 1000) / 1000, ok=n % 10 != 0))
+
+    assert len(sink.series["status"]["sample"]) == 100
+    stats = sink.summary()["status"]
+    assert stats["count"] == 20000 and stats["errors"] == 2000
+    assert stats["bytesSent"] == 200000 and stats["bytesReceived"] == 2000000
+    assert stats["meanSeconds"] == pytest.approx(0.4995)
+    assert 0.3 < stats["p50Seconds"] < 0.7 and stats["p99Seconds"] > 0.9
+
+
+def testMemorySinkIsExactBelowTheReservoirSize():
+    sink = MemorySink()
+    for seconds in (0.3, 0.1, 0.2):
+        sink.emit(event("status", seconds))
+    stats = sink.summary()["status"]
+    assert stats["p50Seconds"] == 0.2 and stats["p99Seconds"] == 0.3 and stats["totalSeconds"] == pytest.approx(0.6)
+
+
+def testResponseBytesComeFromTheTransport(monkeypatch):
+    def noDumps(*args, **kwargs):
+        raise AssertionError("responses are not serialized again to be measured")
+
+    monkeypatch.setattr(instrument, "json", types.SimpleNamespace(dumps=noDumps))
+    fake = FakeAlgod(roundTime=0.01)
+    server = serveFakeAlgod(fake)
+    try:
+        instrumentation = Instrumentation()
+        pooled = instrumentation.instrumentClient(PooledAlgodClient("", server.address))
+        pooled.status()
+        pooled.account_info("A" * 58)
+        direct = instrumentation.instrumentClient(FakeAlgodClient(fake))
+        direct.suggested_params()
+        pooled.close()
+    finally:
+        server.shutdown()
+
+    summary = instrumentation.summary()
+    assert summary["status"]["bytesReceived"] > 0
+    assert summary["account_info"]["bytesReceived"] > summary["status"]["bytesReceived"]
+    assert summary["suggested_params"]["bytesReceived"] == 0  # no transport to ask
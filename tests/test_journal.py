@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from algosdk import error, transaction
+
+from algo_utils.accounts import accountGen
+from algo_utils.distribution import distributeNftResumable
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient
+from algo_utils.journal import RECORD, DistributionJournal
+from algo_utils.params import paramsCache, suggestedParams
+from algo_utils.snapshot import snapshots
+
+ROUND_TIME = 0.005
+
+
+class LostResponseClient(FakeAlgodClient):
+    '''Forwards the first submission to the node but answers it the way a second node does after a failover'''
+
+    def __init__(self, fake):
+        super().__init__(fake)
+        self.lost = 1
+
+    def algod_request(self, method, requrl, *args, **kwargs):
+        result = super().algod_request(method, requrl, *args, **kwargs)
+        if method == "POST" and requrl == "/transactions" and self.lost:
+            self.lost -= 1
+            raise error.AlgodHTTPError("transaction already in ledger", 400)
+        return result
+
+
+@pytest.fixture(autouse=True)
+def freshCaches():
+    paramsCache.invalidate()
+    snapshots.clear()
+    yield
+    paramsCache.invalidate()
+    snapshots.clear()
+
+
+def distributionSetup(recipientCount=3, total=1000):
+    '''A FakeAlgod where the sender holds the whole asset and every recipient is funded and opted in'''
+    fake = FakeAlgod(roundTime=ROUND_TIME)
+    sender = accountGen()
+    recipients = [accountGen() for _ in range(recipientCount)]
+    fake.fund(sender["publicAdress"], 10 ** 7)
+    assetId = fake.createAsset(sender["publicAdress"], total)
+    for recipient in recipients:
+        fake.fund(recipient["publicAdress"], 10 ** 6)
+        fake.optIn(recipient["publicAdress"], assetId)
+    return fake, sender, recipients, assetId
+
+
+def held(fake, account, assetId):
+    return fake.accounts[account["publicAdress"]]["assets"][assetId]["amount"]
+
+
+def signedTransfer(client, sender, receiver, assetId, amount, validRounds):
+    param = client.suggested_params()
+    param.fee = 1000
+    param.flat_fee = True
+    param.last = param.first + validRounds
+    return transaction.AssetTransferTxn(sender["publicAdress"], param, receiver["publicAdress"], amount,
+                                        assetId).sign(sender["privateKey"])
+
+
+def testReplayRestoresEveryState(tmp_path):
+    path = str(tmp_path / "run.journal")
+    sender, a, b, c = [accountGen() for _ in range(4)]
+    journal = DistributionJournal(path, sender["publicAdress"], 7, fee=2000)
+    journal.plan([a["publicAdress"], b["publicAdress"], c["publicAdress"]], [10, 20, 30])
+    txid = "A" * 52
+    journal.sent([(0, txid, 100, 150), (1, "B" * 52, 100, 150)])
+    journal.confirmed(0, 120)
+    journal.failed(1)
+    journal.close()
+
+    replayed = DistributionJournal(path, sender["publicAdress"], 7)
+    assert replayed.fee == 2000
+    assert replayed.counts() == {"planned": 1, "sent": 0, "confirmed": 1, "failed": 1}
+    assert [replayed.receiver(entry) for entry in range(3)] == [a["publicAdress"], b["publicAdress"], c["publicAdress"]]
+    assert replayed.amounts == [10, 20, 30]
+    assert replayed.txids[0] == txid and replayed.validity[0] == (100, 150) and replayed.rounds[0] == 120
+    assert replayed.toSend() == [1, 2]
+    replayed.close()
+
+
+def testReplayDropsTornRecord(tmp_path):
+    path = str(tmp_path / "run.journal")
+    sender, receiver = accountGen(), accountGen()
+    journal = DistributionJournal(path, sender["publicAdress"], 7)
+    journal.plan([receiver["publicAdress"]], [5])
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(2, 0, bytes(32), 1, 2)[:20])  # a crash in the middle of a SENT record
+
+    replayed = DistributionJournal(path, sender["publicAdress"], 7)
+    assert replayed.counts() == {"planned": 1, "sent": 0, "confirmed": 0, "failed": 0}
+    replayed.close()
+    with open(path, "rb") as f:
+        assert len(f.read()) == 2 * RECORD.size
+
+
+def testReplayRejectsAnotherDistribution(tmp_path):
+    path = str(tmp_path / "run.journal")
+    sender = accountGen()
+    DistributionJournal(path, sender["publicAdress"], 7).close()
+    with pytest.raises(ValueError):
+        DistributionJournal(path, sender["publicAdress"], 8)
+
+
+def testReconcileSettlesFromPoolAndBlocks(tmp_path):
+    fake, sender, recipients, assetId = distributionSetup()
+    client = FakeAlgodClient(fake)
+    journal = DistributionJournal(str(tmp_path / "run.journal"), sender["publicAdress"], assetId)
+    journal.plan([recipient["publicAdress"] for recipient in recipients], [1, 2, 3])
+
+    stxns = [signedTransfer(client, sender, recipient, assetId, amount, 10)
+             for recipient, amount in zip(recipients, [1, 2, 3])]
+    journal.sent([(entry, stxn.get_txid(), stxn.transaction.first_valid_round, stxn.transaction.last_valid_round)
+                   for entry, stxn in enumerate(stxns)])
+    client.send_transaction(stxns[0])  # still known to the node
+    client.send_transaction(stxns[1])  # confirmed, but only found in the blocks
+    # stxns[2] never reached the node
+    time.sleep(ROUND_TIME * 4)
+    client.status()
+    del fake.txns[stxns[1].get_txid()]
+
+    assert journal.reconcile(client) == 3
+    assert journal.counts() == {"planned": 0, "sent": 0, "confirmed": 2, "failed": 1}
+    assert journal.toSend() == [2]  # only once its last valid round has passed
+    journal.close()
+
+
+def testLostSubmitResponseIsNotPaidTwice(tmp_path):
+    fake, sender, recipients, assetId = distributionSetup()
+    client = LostResponseClient(fake)
+    path = str(tmp_path / "run.journal")
+
+    counts = distributeNftResumable(client, sender, assetId, recipients, [0.04, 0.06, 0.1], 1000, path, validRounds=20)
+    assert counts == {"planned": 0, "sent": 0, "confirmed": 3, "failed": 0}
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [40, 60, 100]
+
+    sends = fake.calls["send"]
+    counts = distributeNftResumable(client, sender, assetId, recipients, [0.04, 0.06, 0.1], 1000, path, validRounds=20)
+    assert counts["confirmed"] == 3
+    assert fake.calls["send"] == sends
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [40, 60, 100]
+
+
+def testStaleCachedParamsStillGiveLiveTransactions(tmp_path):
+    fake, sender, recipients, assetId = distributionSetup()
+    client = FakeAlgodClient(fake)
+    suggestedParams(client)  # cached here, and still served as fresh by its wall clock estimate
+    time.sleep(ROUND_TIME * 60)
+
+    counts = distributeNftResumable(client, sender, assetId, recipients, [0.1, 0.2, 0.3], 1000,
+                                    str(tmp_path / "run.journal"), validRounds=20)
+    assert counts == {"planned": 0, "sent": 0, "confirmed": 3, "failed": 0}
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [100, 200, 300]
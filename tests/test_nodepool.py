@@ -0,0 +1,63 @@
+import time
+
+from algosdk import error
+
+from algo_utils.accounts import accountGen
+from algo_utils.distribution import distributeNft
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient
+from algo_utils.nodepool import MultiNodeAlgodClient
+
+
+class LaggingClient(FakeAlgodClient):
+    '''A node of the same network that is always one round behind'''
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        parts = requrl.strip("/").split("/")
+        if parts[0] == "blocks" and int(parts[1]) >= self.fake.round:
+            raise error.AlgodHTTPError(f"failed to retrieve information from the ledger: round {parts[1]} not available",
+                                       404)
+        if parts[:2] == ["status", "wait-for-block-after"]:
+            requrl = f"/status/wait-for-block-after/{int(parts[2]) + 1}"
+        result = super().algod_request(method, requrl, params, data, headers, response_format, timeout)
+        if isinstance(result, dict) and "last-round" in result:
+            result = dict(result, **{"last-round": result["last-round"] - 1})
+        return result
+
+
+class HangingStatusClient(FakeAlgodClient):
+    '''A node that answers everything but takes a second to answer a status request'''
+
+    def algod_request(self, method, requrl, *args, **kwargs):
+        if requrl == "/status":
+            time.sleep(1.0)
+        return super().algod_request(method, requrl, *args, **kwargs)
+
+
+def testBlockReadsSkipALaggingNode(capsys):
+    fake = FakeAlgod(roundTime=0.01)
+    client = MultiNodeAlgodClient([LaggingClient(fake), FakeAlgodClient(fake, "http://ahead", latency=0.002)])
+    sender = accountGen()
+    recipients = [accountGen() for _ in range(4)]
+    fake.fund(sender["publicAdress"], 10 ** 7)
+    assetId = fake.createAsset(sender["publicAdress"], 1000)
+    for recipient in recipients:
+        fake.fund(recipient["publicAdress"], 10 ** 6)
+        fake.optIn(recipient["publicAdress"], assetId)
+
+    for _ in range(3):
+        distributeNft(client, sender, assetId, recipients, [0.05] * 4, 1000)
+        assert "Error" not in capsys.readouterr().out
+    assert [fake.accounts[recipient["publicAdress"]]["assets"][assetId]["amount"] for recipient in recipients] == [150] * 4
+    assert fake.calls["block_txids"] > 0
+
+
+def testHealthCheckDoesNotHoldUpRequests():
+    fake = FakeAlgod(roundTime=0.01)
+    client = MultiNodeAlgodClient([HangingStatusClient(fake), FakeAlgodClient(fake, "http://second")], healthInterval=0)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        client.suggested_params()
+    assert time.perf_counter() - start < 0.5
+    time.sleep(1.2)
+    assert client.lastCheck > 0
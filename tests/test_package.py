@@ -0,0 +1,15 @@
+import importlib
+
+import algo_utils
+
+
+def testEveryExportIsDefinedInItsModule():
+    for name, module in algo_utils.EXPORTS.items():
+        assert hasattr(importlib.import_module(f"algo_utils.{module}"), name), name
+
+
+def testGenerateAccountsIsExported():
+    from algo_utils.keystore import generateAccounts
+
+    assert "generateAccounts" in algo_utils.__all__
+    assert algo_utils.generateAccounts is generateAccounts
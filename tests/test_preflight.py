@@ -0,0 +1,79 @@
+import pytest
+
+from algo_utils.accounts import accountGen
+from algo_utils.bulk_optin import bulkOptIn
+from algo_utils.distribution import distributeCapTable, distributeNft, distributeNftBatched
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient
+from algo_utils.params import paramsCache
+from algo_utils.snapshot import snapshots
+
+
+@pytest.fixture(autouse=True)
+def freshCaches():
+    paramsCache.invalidate()
+    snapshots.clear()
+    yield
+    paramsCache.invalidate()
+    snapshots.clear()
+
+
+def setup(optedIn=2, notOptedIn=1):
+    '''A sender holding the whole asset, funded recipients of which only the first `optedIn` are opted in'''
+    fake = FakeAlgod(roundTime=0.005)
+    sender = accountGen()
+    fake.fund(sender["publicAdress"], 10 ** 7)
+    assetId = fake.createAsset(sender["publicAdress"], 1000)
+    recipients = [accountGen() for _ in range(optedIn + notOptedIn)]
+    for n, recipient in enumerate(recipients):
+        fake.fund(recipient["publicAdress"], 10 ** 6)
+        if n < optedIn:
+            fake.optIn(recipient["publicAdress"], assetId)
+    return fake, FakeAlgodClient(fake), sender, recipients, assetId
+
+
+def held(fake, account, assetId):
+    holding = fake.accounts[account["publicAdress"]]["assets"].get(assetId)
+    return None if holding is None else holding["amount"]
+
+
+def testDistributeNftSkipsRecipientsNotOptedIn(capsys):
+    fake, client, sender, recipients, assetId = setup()
+
+    distributeNft(client, sender, assetId, recipients, [0.1, 0.2, 0.3], 1000)
+    out = capsys.readouterr().out
+    assert "Skipped 0.3 fractional NFTs to " + recipients[2]["publicAdress"] in out
+    assert "not opted in" in out and "Error" not in out
+    assert fake.calls["send"] == 2
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [100, 200, None]
+
+
+def testDistributeNftBatchedSkipsRejectedGroups(capsys):
+    fake, client, sender, recipients, assetId = setup(optedIn=1)
+
+    distributeNftBatched(client, sender, assetId, recipients, [0.2, 0.2], 100, groupSize=1)
+    assert "Skipped group of 1 fractional NFT transfers" in capsys.readouterr().out
+    assert fake.calls["send"] == 1
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [20, None]
+
+
+def testDistributeCapTableCountsRejectedTransfers(tmp_path):
+    fake, client, sender, recipients, assetId = setup(optedIn=3, notOptedIn=1)
+    table = tmp_path / "cap.csv"
+    table.write_text("address,weight\n" + "".join(f"{recipient['publicAdress']},1\n" for recipient in recipients))
+
+    outcome = distributeCapTable(client, sender, assetId, str(table), 400, groupSize=2)
+    assert outcome["confirmed"] == 2 and outcome["rejected"] == 2 and outcome["failed"] == 0
+    assert [held(fake, recipient, assetId) for recipient in recipients] == [100, 100, 0, None]
+
+
+def testBulkOptInLeavesOutUnfundedMembers():
+    fake, client, sponsor, members, assetId = setup(optedIn=0, notOptedIn=4)
+    unfunded = accountGen()
+    members.insert(1, unfunded)
+
+    outcomes = bulkOptIn(client, members, assetId, sponsor=sponsor)
+    assert outcomes[unfunded["publicAdress"]]["status"] == "failed"
+    assert "min-balance" in outcomes[unfunded["publicAdress"]]["error"]
+    assert all(outcomes[member["publicAdress"]]["status"] == "opted-in" for member in members if member is not unfunded)
+    assert fake.calls["send"] == 1
+    assert held(fake, unfunded, assetId) is None
@@ -0,0 +1,105 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from algosdk import error, transaction
+
+from algo_utils.accounts import accountGen
+from algo_utils.fake_algod import FakeAlgod, FakeAlgodClient
+from algo_utils.nodepool import MultiNodeAlgodClient
+from algo_utils.transport import PooledAlgodClient
+
+
+class DroppedResponseClient(FakeAlgodClient):
+    '''A node that takes a submission and loses the connection before answering'''
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        result = super().algod_request(method, requrl, params, data, headers, response_format, timeout)
+        if method == "POST" and requrl == "/transactions":
+            raise ConnectionResetError("connection reset by peer")
+        return result
+
+
+@pytest.fixture
+def dropFirstPost():
+    '''A keep-alive FakeAlgod server that closes the connection instead of answering the first POST it takes'''
+    fake = FakeAlgod(roundTime=0.005)
+    dropped = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def respond(self, method):
+            url = urlparse(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, result = fake.handle(method, url.path, parse_qs(url.query), body)
+            if method == "POST" and not dropped:
+                dropped.append(status)
+                self.close_connection = True
+                return
+            data = json.dumps(result).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self.respond("GET")
+
+        def do_POST(self):
+            self.respond("POST")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield fake, f"http://127.0.0.1:{server.server_port}", dropped
+    server.shutdown()
+
+
+def payment(client, fake, amount=200000):
+    sender, receiver = accountGen(), accountGen()
+    fake.fund(sender["publicAdress"], 10 ** 7)
+    txn = transaction.PaymentTxn(sender["publicAdress"], client.suggested_params(), receiver["publicAdress"], amount)
+    return txn.sign(sender["privateKey"]), receiver
+
+
+def testFailedOverSubmitAlreadyInLedgerIsTaken():
+    fake = FakeAlgod(roundTime=0.005)
+    first, second = DroppedResponseClient(fake), FakeAlgodClient(fake, "http://second", latency=0.01)
+    client = MultiNodeAlgodClient([first, second], cooldown=60, healthInterval=60)
+    client.checkHealth()
+    stxn, receiver = payment(client, fake)
+    client.nodes[0].lastRound = client.nodes[1].lastRound + 1  # the submission goes to the dropping node first
+
+    assert client.send_transaction(stxn) == stxn.get_txid()
+    assert client.failovers == 1
+    assert fake.calls["send"] == 2
+    assert fake.accounts[receiver["publicAdress"]]["amount"] == 200000
+
+
+def testFirstSubmitAlreadyInLedgerStillRaises():
+    fake = FakeAlgod(roundTime=0.005)
+    client = MultiNodeAlgodClient([FakeAlgodClient(fake)])
+    stxn, receiver = payment(client, fake)
+    client.send_transaction(stxn)
+
+    with pytest.raises(error.AlgodHTTPError, match="already in ledger"):
+        client.send_transaction(stxn)
+
+
+def testResentSubmitAlreadyInLedgerIsTaken(dropFirstPost):
+    fake, address, dropped = dropFirstPost
+    client = PooledAlgodClient("", address, maxConnections=1)
+    stxn, receiver = payment(client, fake)  # leaves the connection open for the submission to reuse
+
+    assert client.send_transaction(stxn) == stxn.get_txid()
+    assert dropped == [200]
+    assert client.transportStats()["retries"] == 1
+    assert fake.accounts[receiver["publicAdress"]]["amount"] == 200000
+    client.close()